@@ -1,4 +1,4 @@
-from . import app, gamelogic, image, menu, savegame
+from . import app, binformat, bitboard, cli, engine, gamelogic, generator, grading, image, imagecache, journal, library, menu, pack, prefetch, savegame, solver, thumbnails
 
 # print("Onono! - Simon Ruzicka, 2022 \nTo exit the game, close the window or press Ctrl+C")
 # app.run()
@@ -1,5 +1,21 @@
-import menu
+import sys
 
-print("Onono! - Simon Ruzicka, 2022 \nTo exit the game, close the window or press Ctrl+C")
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # command line tools... see `python onono --help`
+        if __package__ == "":
+            # launched as `python onono`
+            import cli
+        else:
+            # launched as `python -m onono`
+            from . import cli
+        sys.exit(cli.main())
 
-menu.run()
+    if __package__ == "":
+        import menu
+    else:
+        from . import menu
+
+    print("Onono! - Simon Ruzicka, 2022 \nTo exit the game, close the window or press Ctrl+C")
+
+    menu.run()
@@ -11,22 +11,26 @@ import pygame as pg
 if __package__ == "":
     # when imported from __main__
     import savegame
-    import gamelogic
+    import engine
+    import journal
     from gui_definitions import \
         COLOR, FONT_PATH, FONT_MONO_PATH, GAME_CAPTION, SCREEN_SIZE, \
-        GAME_INITIAL_COORDS, BLOCK_SIZE, BLOCK_MARGIN
+        GAME_INITIAL_COORDS, BLOCK_SIZE, BLOCK_MARGIN, DEBUG
 else:
     # when imported from __init__
-    from . import savegame, gamelogic
+    from . import savegame, engine, journal
     from .gui_definitions import \
         COLOR, FONT_PATH, FONT_MONO_PATH, GAME_CAPTION, SCREEN_SIZE, \
-        GAME_INITIAL_COORDS, BLOCK_SIZE, BLOCK_MARGIN
+        GAME_INITIAL_COORDS, BLOCK_SIZE, BLOCK_MARGIN, DEBUG
 
 
-def run(screen: pg.Surface = None, game: savegame.SaveGame = None):
+def run(screen: pg.Surface = None, game: savegame.SaveGame = None, elapsed: float = 0.):
     """
     Start the game window. Gets two parameters - pygame screen and SaveGame object. If they
     are not given, they are newly created within this function (new game is randomly generated).
+    Resumed game continues with the timer at `elapsed` seconds.
+
+    All moves are written into the session journal (see `journal`), the journal is deleted when the game is won.
     """
     no_screen = screen is None
     if no_screen:
@@ -46,8 +50,11 @@ def run(screen: pg.Surface = None, game: savegame.SaveGame = None):
         "mouse_button": None,
         "last_position": np.array([-1, -1]),
         "show_timer": False,
-        "start": time.time(),
+        "start": time.time() - elapsed,
         "game": game,
+        "engine": engine.Engine(game),
+        "journal": journal.Journal(journal.session_path(), game, elapsed),
+        "hint": None,  # last hint from the engine, shown until the next change of the board
         "screen": screen,
         "started_without_screen": no_screen  # screen that was created here will be shut down
     }
@@ -58,7 +65,8 @@ def run(screen: pg.Surface = None, game: savegame.SaveGame = None):
 
         get_events(event_data)
 
-        if gamelogic.validate_game(game):
+        if event_data["engine"].is_won():
+            event_data["journal"].close(delete=True)
             draw_game(screen, game)
             end_game(event_data)
             return game  # used when saving generated game
@@ -69,6 +77,7 @@ def run(screen: pg.Surface = None, game: savegame.SaveGame = None):
 
         draw_game(screen, game)
         draw_timer(event_data)
+        draw_hint(event_data)
 
         # refresh screen
         pg.display.flip()
@@ -79,7 +88,7 @@ def prepare_game() -> savegame.SaveGame:
     Helper function for randomly generating a SaveGame.
     """
     s = savegame.SaveGame((10, 10))
-    s.randomize(0.8)
+    s.randomize(0.8, unique=True)
     return s
 
 
@@ -90,6 +99,9 @@ def get_events(data: dict):
     mouse_event = None
     for event in pg.event.get():
         if event.type == pg.QUIT:
+            # elapsed time since the last move is kept as well
+            data["journal"].snapshot(time.time() - data["start"])
+            data["journal"].close()
             pg.quit()
             sys.exit(1)
         if event.type == pg.MOUSEBUTTONDOWN and event.__dict__["button"] in [1, 3]:
@@ -100,6 +112,11 @@ def get_events(data: dict):
         if event.type == pg.MOUSEBUTTONUP and event.__dict__["button"] in [1, 3]:
             data["mouse_button"] = None
             data["last_position"] = np.array([-1, -1])
+        if event.type == pg.KEYDOWN and event.__dict__["key"] == pg.K_h:
+            data["hint"] = data["engine"].hint()
+        if event.type == pg.KEYDOWN and event.__dict__["key"] == pg.K_F12 and DEBUG:
+            data["engine"].solve()
+            data["journal"].snapshot(time.time() - data["start"])
 
         if data["mouse_button"] is not None and mouse_event is not None:
             handle_click(mouse_event, data)
@@ -120,10 +137,6 @@ def handle_click(click: pg.event.Event, data: dict):
 
     pos = (pos - GAME_INITIAL_COORDS) // BLOCK_SIZE
 
-    # solves the game... remove for production
-    if pos[0] == pos[1] == -1:
-        data["game"].get_solution(True)
-
     if (pos == data["last_position"]).sum() == 2:
         return
 
@@ -133,9 +146,9 @@ def handle_click(click: pg.event.Event, data: dict):
     # debug data... logging clicks to terminal
     # print(pos, button)
 
-    dims = data["game"].board.shape
-    if pos[0] in range(dims[0]) and pos[1] in range(dims[1]):
-        gamelogic.change_field(data["game"], pos, button)
+    if data["engine"].apply_move(int(pos[0]), int(pos[1]), button):
+        data["hint"] = None
+        data["journal"].record(int(pos[0]), int(pos[1]), button, time.time() - data["start"])
 
 
 def draw_game(screen: pg.Surface, game: savegame.SaveGame):
@@ -148,9 +161,11 @@ def draw_game(screen: pg.Surface, game: savegame.SaveGame):
 
     coords = list(GAME_INITIAL_COORDS)  # creates a copy
 
-    for row, lengths in zip(game.guesses, game.y):
+    row_conflicts, col_conflicts = game.conflicts
+
+    for row, lengths, conflict in zip(game.guesses, game.y, row_conflicts):
         lengths_coords = (coords[0], coords[1] + (0.4 * BLOCK_SIZE[1]))
-        draw_vector(np.array(lengths_coords), lengths, screen, False)
+        draw_vector(np.array(lengths_coords), lengths, screen, False, conflict)
 
         for pos in row:
             pg.draw.rect(screen, COLOR["black"], (*(coords - BLOCK_MARGIN), *(BLOCK_SIZE + 2 * BLOCK_MARGIN)))
@@ -169,19 +184,23 @@ def draw_game(screen: pg.Surface, game: savegame.SaveGame):
 
     coords = list(GAME_INITIAL_COORDS)
     coords = [coords[0] + 0.4 * BLOCK_SIZE[0], coords[1]]
-    for lengths in game.x:
-        draw_vector(np.array(coords), lengths, screen, True)
+    for lengths, conflict in zip(game.x, col_conflicts):
+        draw_vector(np.array(coords), lengths, screen, True, conflict)
         coords[0] += BLOCK_SIZE[0]
         coords[1] = list(GAME_INITIAL_COORDS)[1]
 
 
-def draw_vector(coords: np.ndarray, vector: (list, bool), screen: pg.Surface, vertical: bool):
+def draw_vector(coords: np.ndarray, vector: (list, bool), screen: pg.Surface, vertical: bool, conflict: bool = False):
     """
-    Draws one vector of hints to the game screen.
+    Draws one vector of hints to the game screen. Lines that cannot be completed with the current
+    guesses (`conflict`) are highlighted.
     """
     text, complete = vector
     font = pg.font.Font(FONT_MONO_PATH, 15)
-    color = COLOR["full"] if complete else COLOR["black"]
+    if conflict:
+        color = COLOR["conflict"]
+    else:
+        color = COLOR["full"] if complete else COLOR["black"]
     delta = np.array([0., -font.get_linesize()]) if vertical else np.array([-font.size("10")[0], 0.])
 
     for num in text[::-1]:
@@ -212,6 +231,34 @@ def draw_timer(data: dict):
     data["screen"].blit(text, pos)
 
 
+def draw_hint(data: dict):
+    """
+    Highlights the field (or the whole line in case of a conflict) from the last hint and draws
+    its explanation below the board.
+    """
+    font = pg.font.Font(FONT_PATH, 20)
+    hint = data["hint"]
+    pos = (50, SCREEN_SIZE[1] - 35)
+
+    if hint is None:
+        text = font.render("Press H for a hint", True, COLOR["empty"])
+        data["screen"].blit(text, pos)
+        return
+
+    dims = np.array(data["game"].board.shape[::-1])  # (columns, rows) as the screen coordinates
+    if hint["conflict"]:
+        start = np.array([0, hint["index"]] if hint["axis"] == 0 else [hint["index"], 0])
+        size = np.array([dims[0], 1] if hint["axis"] == 0 else [1, dims[1]])
+    else:
+        start, size = np.array([hint["col"], hint["row"]]), np.array([1, 1])
+
+    rect = (*(GAME_INITIAL_COORDS + start * BLOCK_SIZE - BLOCK_MARGIN), *(size * BLOCK_SIZE + 2 * BLOCK_MARGIN))
+    pg.draw.rect(data["screen"], COLOR["hint"], rect, 4)
+
+    text = font.render(hint["reason"], True, COLOR["hint"])
+    data["screen"].blit(text, pos)
+
+
 def end_game(data: dict):
     """
     Ends the game with a win. Is not started when game window is closed.
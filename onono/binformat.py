@@ -0,0 +1,124 @@
+"""
+Compact binary format of the save files. The board (and optionally the guesses of the player) is packed
+into bits, after a small header with the version, dimensions and a checksum of the data:
+
+    magic (4 bytes) | version (2) | flags (2) | rows (4) | columns (4) | CRC-32 of the data (4) | data
+
+Data is the packed board, followed by two packed bit planes of the guesses (X and full) when they are stored.
+With the `FLAG_HINTS` flag, the planes are followed by the hints of the board (as in the `pack` format, the number
+of hints of every row and column and the hints themselves, all as uint16), so they are not calculated on loading.
+"""
+
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"ONON"
+VERSION = 1
+EXTENSION = ".nono"
+
+HEADER = struct.Struct("<4sHHIII")
+
+# flags in the header
+FLAG_GUESSES = 1
+FLAG_HINTS = 2
+
+HINT_DTYPE = np.dtype("<u2")
+
+
+def dumps(board: np.ndarray, guesses: np.ndarray = None, runs: dict = None) -> bytes:
+    """
+    Converts the board (and the guesses, if given) into the binary format. Hints of the board can be stored
+    as well, given in the format of `SaveGame.runs` (skipped for lines longer than the range of uint16).
+    """
+    board = np.asarray(board, bool)
+    planes = [board] if guesses is None else [board, guesses == 1, guesses == 2]
+    data = b"".join(np.packbits(plane, axis=None).tobytes() for plane in planes)
+
+    flags = 0 if guesses is None else FLAG_GUESSES
+    if runs is not None and max(board.shape) <= np.iinfo(HINT_DTYPE).max:
+        (row_offsets, row_lengths), (col_offsets, col_lengths) = runs["y"], runs["x"]
+        data += np.concatenate((np.diff(row_offsets), np.diff(col_offsets))).astype(HINT_DTYPE).tobytes()
+        data += np.concatenate((row_lengths, col_lengths)).astype(HINT_DTYPE).tobytes()
+        flags |= FLAG_HINTS
+
+    return HEADER.pack(MAGIC, VERSION, flags, *board.shape, zlib.crc32(data)) + data
+
+
+def loads(data: bytes) -> tuple:
+    """
+    Reads the board, the guesses and the hints in the format of `SaveGame.runs` from the binary format
+    (None for the guesses and the hints that are not stored). Raises ValueError for invalid or damaged data.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("File is too short")
+
+    magic, version, flags, rows, cols, checksum = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not an Onono! save file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported version {version}")
+
+    planes = 3 if flags & FLAG_GUESSES else 1
+    plane_size = (rows * cols + 7) // 8
+    data = memoryview(data)[HEADER.size:]
+    hints_size = len(data) - planes * plane_size
+    if hints_size < 0 or (hints_size and not flags & FLAG_HINTS) or rows * cols == 0:
+        raise ValueError("Invalid dimensions")
+    if zlib.crc32(data) != checksum:
+        raise ValueError("Checksum does not match")
+
+    packed = np.frombuffer(data, np.uint8, planes * plane_size).reshape((planes, plane_size))
+    bits = np.unpackbits(packed, axis=1, count=rows * cols).reshape((planes, rows, cols))
+    runs = load_hints(data[planes * plane_size:], rows, cols) if flags & FLAG_HINTS else None
+
+    if planes == 1:
+        return bits[0].astype(bool), None, runs
+    return bits[0].astype(bool), (bits[1] + 2 * bits[2]).astype(np.int8), runs
+
+
+def load_hints(data: memoryview, rows: int, cols: int) -> dict:
+    """
+    Reads the hints stored after the planes, see `loads()`.
+    """
+    counts = np.frombuffer(data, HINT_DTYPE, min(rows + cols, len(data) // HINT_DTYPE.itemsize))
+    if len(data) != (rows + cols + int(counts.sum(dtype=np.int64))) * HINT_DTYPE.itemsize:
+        raise ValueError("Invalid hints")
+    lengths = np.frombuffer(data, HINT_DTYPE, offset=counts.nbytes).astype(int)
+
+    offsets = np.zeros(rows + cols + 1, int)
+    np.cumsum(counts, out=offsets[1:])
+    return {"y": (offsets[:rows + 1], lengths[:offsets[rows]]),
+            "x": (offsets[rows:] - offsets[rows], lengths[offsets[rows]:])}
+
+
+def write(path: Path, board: np.ndarray, guesses: np.ndarray = None, runs: dict = None, atomic: bool = False):
+    """
+    Writes the board (and the guesses and the hints, if given) into a binary file.
+    With `atomic`, a temporary file is written and then renamed, so other threads and processes never read
+    a partial file. The temporary file is removed when the write fails.
+    """
+    path = Path(path)
+    data = dumps(board, guesses, runs)
+    if not atomic:
+        path.write_bytes(data)
+        return
+
+    temp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        temp.write_bytes(data)
+        os.replace(temp, path)
+    except OSError:
+        temp.unlink(missing_ok=True)
+        raise
+
+
+def read(path: Path) -> tuple:
+    """
+    Reads a binary file, see `loads()`.
+    """
+    return loads(Path(path).read_bytes())
@@ -0,0 +1,44 @@
+"""
+Bit-packed representation of the game board. Every row and column is stored as packed bits
+(64 fields in one word), comparing whole lines then takes only a few word comparisons.
+"""
+
+import numpy as np
+
+
+def pack_lines(matrix: np.ndarray) -> np.ndarray:
+    """
+    Packs every row of a 2D boolean array into 64-bit words. Rows are padded with zeros,
+    so that the result has the shape (rows, ceil(columns / 64)).
+    """
+    packed = np.packbits(matrix, axis=1)
+    padding = -packed.shape[1] % 8
+    if padding:
+        packed = np.pad(packed, ((0, 0), (0, padding)))
+
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+
+class BitBoard:
+    """
+    Stores the correct solution (board) as packed rows and columns.
+    """
+    def __init__(self, board: np.ndarray):
+        self.rows = pack_lines(board)
+        self.cols = pack_lines(board.T)
+
+    def matching_lines(self, filled: np.ndarray, transposed: bool = False) -> np.ndarray:
+        """
+        Takes a boolean matrix of full fields and returns for every row (column if `transposed` is set)
+        whether it is exactly equal to the board.
+        """
+        if transposed:
+            return (pack_lines(filled.T) == self.cols).all(axis=1)
+
+        return (pack_lines(filled) == self.rows).all(axis=1)
+
+    def line(self, i: int, transposed: bool = False) -> np.ndarray:
+        """
+        Returns one packed row (column if `transposed` is set) of the board.
+        """
+        return self.cols[i] if transposed else self.rows[i]
@@ -0,0 +1,341 @@
+"""
+Command line tools for working with the puzzles without the GUI, launched by `python onono <command>`
+(or `python -m onono <command>`).
+Results are printed as JSON lines, one line per puzzle.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+from pathlib import Path
+
+import numpy as np
+
+if __package__ == "":
+    # when imported from __main__
+    import savegame
+    import grading
+    import generator
+    import binformat
+    import pack
+    import image
+else:
+    # when imported from __init__
+    from . import savegame, grading, generator, binformat, pack, image
+
+# how often the grade index is written while grading (in number of graded files)
+GRADE_SAVE_INTERVAL = 1000
+
+
+def main(argv: list = None) -> int:
+    """
+    Parses the command line arguments and runs the selected command. Returns the exit code.
+    """
+    parser = argparse.ArgumentParser(prog="onono", description="Onono! The Puzzle Game - command line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    solve = commands.add_parser("solve", help="solve all puzzles (text and binary files) in a directory")
+    solve.add_argument("directory", nargs="?", type=Path, default=savegame.get_saves_dir(),
+                       help="directory with the puzzles (default: saves)")
+    solve.add_argument("-r", "--recursive", action="store_true", help="include subdirectories")
+    add_pool_arguments(solve)
+    solve.add_argument("-t", "--timeout", type=float, default=10., help="time limit for one puzzle in seconds")
+    solve.set_defaults(func=solve_command)
+
+    grade = commands.add_parser("grade", help="grade difficulty of all puzzles in saves and saves/images")
+    add_pool_arguments(grade)
+    grade.set_defaults(func=grade_command)
+
+    generate = commands.add_parser("generate", help="generate random puzzles with a unique solution")
+    generate.add_argument("output", type=Path, help="output directory for the puzzles (CSV files), or pack file with --pack")
+    generate.add_argument("-p", "--pack", action="store_true", help="write all puzzles into one pack file")
+    generate.add_argument("-n", "--count", type=int, default=100, help="number of puzzles")
+    generate.add_argument("-s", "--seed", type=int, help="seed of the puzzles (default: random, printed at the end)")
+    generate.add_argument("--size", type=int, nargs=2, default=(10, 10), metavar=("MIN", "MAX"),
+                          help="range of the number of rows and columns")
+    generate.add_argument("-d", "--density", type=float, default=0.6, help="probability of a full field")
+    add_pool_arguments(generate)
+    generate.set_defaults(func=generate_command)
+
+    convert = commands.add_parser("convert", help="convert the text files (CSV) in a directory into the binary format")
+    convert.add_argument("directory", nargs="?", type=Path, default=savegame.get_saves_dir(),
+                         help="directory with the puzzles (default: saves)")
+    convert.add_argument("-r", "--recursive", action="store_true", help="include subdirectories")
+    convert.add_argument("--delete", action="store_true", help="delete the text files after the conversion")
+    add_pool_arguments(convert)
+    convert.set_defaults(func=convert_command)
+
+    images = commands.add_parser("images", help="convert images (PNG) into puzzles of several sizes and fill ratios")
+    images.add_argument("output", type=Path, help="output pack file")
+    images.add_argument("directory", nargs="?", type=Path, default=savegame.get_saves_dir() / "images",
+                        help="directory with the images (default: saves/images)")
+    images.add_argument("-r", "--recursive", action="store_true", help="include subdirectories")
+    images.add_argument("--size", type=int, nargs=2, action="append", metavar=("ROWS", "COLS"),
+                        help="size of the puzzles, can be repeated (default: 10 10)")
+    images.add_argument("-f", "--fill", type=float, nargs="+", default=[0.7], help="ratios of full fields")
+    images.add_argument("-u", "--unique", action="store_true", help="adjust the puzzles to have a unique solution")
+    add_pool_arguments(images)
+    images.set_defaults(func=images_command)
+
+    mosaic = commands.add_parser("mosaic", help="cut one image into a grid of puzzles that together show the image")
+    mosaic.add_argument("image", type=Path, help="image file")
+    mosaic.add_argument("output", type=Path, help="output pack file, puzzles are ordered by rows of the grid")
+    mosaic.add_argument("--grid", type=int, nargs=2, default=(2, 2), metavar=("ROWS", "COLS"), help="number of puzzles")
+    mosaic.add_argument("--size", type=int, nargs=2, default=(10, 10), metavar=("ROWS", "COLS"), help="size of one puzzle")
+    mosaic.add_argument("-f", "--fill", type=float, default=0.7, help="ratio of full fields")
+    mosaic.add_argument("--local", action="store_true", help="threshold every puzzle separately")
+    mosaic.set_defaults(func=mosaic_command)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+def add_pool_arguments(parser: argparse.ArgumentParser):
+    """
+    Adds the number of worker processes to the arguments of a command.
+    """
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="number of worker processes (default: number of CPUs)")
+
+
+def run_pool(function, tasks: list, jobs: int):
+    """
+    Runs the function on every task in a pool of processes and yields the results as soon as they
+    are finished (in any order). With one job, everything runs in the current process.
+    """
+    if jobs <= 1 or len(tasks) <= 1:
+        yield from map(function, tasks)
+        return
+
+    # bigger chunks for many small tasks, but still streaming the results
+    chunksize = max(1, min(64, len(tasks) // (jobs * 8)))
+    with multiprocessing.Pool(jobs) as pool:
+        yield from pool.imap_unordered(function, tasks, chunksize)
+
+
+def find_files(directory: Path, pattern: str, recursive: bool) -> list:
+    """
+    Sorted list of files matching the pattern in the directory. Hidden files and directories (eg. caches
+    in `saves`) are skipped.
+    """
+    files = directory.rglob(pattern) if recursive else directory.glob(pattern)
+    return sorted(path for path in files
+                  if path.is_file() and not any(part.startswith(".") for part in path.relative_to(directory).parts))
+
+
+def solve_command(args: argparse.Namespace) -> int:
+    """
+    Solves every puzzle in the directory and prints the results.
+    """
+    paths = find_files(args.directory, "*.csv", args.recursive)
+    paths += find_files(args.directory, "*" + binformat.EXTENSION, args.recursive)
+    tasks = [(path, args.timeout) for path in sorted(paths)]
+
+    for result in run_pool(solve_file, tasks, args.jobs):
+        print(json.dumps(result), flush=True)
+
+    return 0
+
+
+def solve_file(task: tuple) -> dict:
+    """
+    Loads one puzzle and solves it from its hints. Runs in the worker processes. Solvability and uniqueness
+    are None (null) when the time limit stopped the search before they were known.
+    """
+    path, timeout = task
+    game = savegame.SaveGame()
+    if not game.load_path(path):
+        return {"file": str(path), "error": "invalid file"}
+
+    result = game.solve(max_solutions=2, time_limit=timeout)
+    return {
+        "file": str(path),
+        "rows": game.board.shape[0],
+        "cols": game.board.shape[1],
+        "solvable": result["solved"],
+        "unique": result["unique"],
+        "timeout": result["timeout"],
+        "time": round(result["time"], 6),
+        "iterations": result["iterations"],
+        "guesses": result["guesses"]
+    }
+
+
+def grade_command(args: argparse.Namespace) -> int:
+    """
+    Grades the new or changed puzzles of the library, stores the grades in the index
+    and prints the grades of all puzzles.
+    """
+    index = grading.GradeIndex()
+    paths = grading.get_library()
+    stale = index.stale(paths)
+
+    # grades finished before an error (or Ctrl+C) are kept
+    try:
+        for i, (path, grade) in enumerate(run_pool(grade_path, stale, args.jobs)):
+            index.set(path, grade)
+            print(json.dumps({"file": str(path), "cached": False, **(grade or {"error": "invalid file"})}), flush=True)
+            if i % GRADE_SAVE_INTERVAL == GRADE_SAVE_INTERVAL - 1:
+                index.save()
+    finally:
+        index.save()
+
+    for path in sorted(set(paths) - set(stale)):
+        grade = index.get(path)
+        print(json.dumps({"file": str(path), "cached": True, **(grade or {"error": "invalid file"})}))
+
+    return 0
+
+
+def grade_path(path: Path) -> tuple:
+    """
+    Grades one file in a worker process, returns the path together with the grade.
+    """
+    return path, grading.grade_file(path)
+
+
+def generate_command(args: argparse.Namespace) -> int:
+    """
+    Generates the puzzles in parallel and writes them as they are finished - into the directory, named by their
+    index (so the same seed always gives the same files), or into one pack (see `pack`) ordered by the index.
+    """
+    seed = np.random.SeedSequence(args.seed).entropy
+    sizes = min(args.size), max(args.size)
+    tasks = [(seed, i, sizes, args.density) for i in range(args.count)]
+
+    (args.output.parent if args.pack else args.output).mkdir(parents=True, exist_ok=True)
+    writer = pack.PackWriter(args.output) if args.pack else None
+    game = savegame.SaveGame()
+    width = len(str(max(args.count - 1, 0)))
+    generated = 0
+
+    for index, board in run_pool(generator.generate_task, tasks, args.jobs):
+        if board is None:
+            print(json.dumps({"index": index, "error": "no unique puzzle found"}), flush=True)
+            continue
+
+        if writer is None:
+            path = args.output / f"puzzle{index:0{width}d}.csv"
+            game.board = board
+            game.save_path(path)
+            result = {"file": str(path)}
+        else:
+            writer.add(board, key=index)
+            result = {"index": index}
+
+        generated += 1
+        print(json.dumps({**result, "rows": board.shape[0], "cols": board.shape[1]}), flush=True)
+
+    if writer is not None:
+        writer.close()
+
+    print(json.dumps({"seed": seed, "generated": generated, "count": args.count}))
+    return 0
+
+
+def convert_command(args: argparse.Namespace) -> int:
+    """
+    Converts every text file in the directory into a binary file with the same name.
+    """
+    tasks = [(path, args.delete) for path in find_files(args.directory, "*.csv", args.recursive)]
+
+    for result in run_pool(convert_file, tasks, args.jobs):
+        print(json.dumps(result), flush=True)
+
+    return 0
+
+
+def convert_file(task: tuple) -> dict:
+    """
+    Converts one file in a worker process. Invalid files are kept as they are.
+    """
+    path, delete = task
+    game = savegame.SaveGame()
+    if not game.load_path(path):
+        return {"file": str(path), "error": "invalid file"}
+
+    output = path.with_suffix(binformat.EXTENSION)
+    game.save_path(output)
+    result = {"file": str(path), "output": str(output), "size": path.stat().st_size, "output_size": output.stat().st_size}
+    if delete:
+        path.unlink()
+
+    return result
+
+
+def images_command(args: argparse.Namespace) -> int:
+    """
+    Converts every image in the directory into puzzles of all the sizes and fill ratios in parallel.
+    Puzzles are written into one pack as they are finished, ordered by the index - by the image and then
+    by the size and ratio (index of every puzzle is printed with the image it comes from).
+    """
+    shapes = [tuple(size) for size in args.size or [(10, 10)]]
+    paths = find_files(args.directory, "*.png", args.recursive)
+    tasks = [(number, path, shapes, args.fill, args.unique) for number, path in enumerate(paths)]
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    converted = 0
+    with pack.PackWriter(args.output) as writer:
+        for results in run_pool(image_task, tasks, args.jobs):
+            for result in results:
+                board = result.pop("board", None)
+                if board is not None:
+                    writer.add(board, key=result["index"])
+                    converted += 1
+                print(json.dumps(result), flush=True)
+
+    print(json.dumps({"images": len(paths), "puzzles": len(paths) * len(shapes) * len(args.fill), "converted": converted}))
+    return 0
+
+
+def image_task(task: tuple) -> list:
+    """
+    Converts one image into the puzzles in a worker process (see `image.image_boards()`). Returns the result
+    of every puzzle with its index (order in the pack) and the board, or the error. Ambiguous boards are adjusted
+    if `unique` is set, boards that stay ambiguous are dropped.
+    """
+    number, path, shapes, fills, unique = task
+    try:
+        boards = image.image_boards(path, shapes, fills)
+    except (OSError, ValueError):
+        return [{"file": str(path), "error": "invalid image"}]
+
+    variants = [{"rows": rows, "cols": cols, "fill": fill} for rows, cols in shapes for fill in fills]
+    game = savegame.SaveGame()
+    results = []
+    for i, (variant, board) in enumerate(zip(variants, boards)):
+        result = {"index": number * len(variants) + i, "file": str(path), **variant}
+        if board is None:
+            result["error"] = "image is too small"
+        elif unique:
+            game.set_board(board)
+            if game.make_unique(time_limit=None, max_guesses=generator.GUESS_LIMIT):
+                result["board"] = game.board.copy()
+            else:
+                result["error"] = "no unique puzzle found"
+        else:
+            result["board"] = board
+        results.append(result)
+
+    return results
+
+
+def mosaic_command(args: argparse.Namespace) -> int:
+    """
+    Cuts the image into a grid of puzzles (see `image.mosaic()`) and writes them into one pack,
+    row by row of the grid. The grid is stored in the pack, `pack.PackReader.picture()` joins the puzzles again.
+    """
+    try:
+        boards = image.mosaic(args.image, tuple(args.grid), tuple(args.size), args.fill, args.local)
+    except (OSError, ValueError, AssertionError):
+        print(json.dumps({"file": str(args.image), "error": "invalid image"}))
+        return 1
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with pack.PackWriter(args.output, grid=args.grid) as writer:
+        for index, (row, col) in enumerate(np.ndindex(*args.grid)):
+            writer.add(boards[row, col])
+            print(json.dumps({"index": index, "row": row, "col": col, "rows": args.size[0], "cols": args.size[1]}))
+
+    return 0
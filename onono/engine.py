@@ -0,0 +1,160 @@
+"""
+Headless game engine. Applies the moves of a player to a SaveGame and answers the state of the game
+without any need of pygame, module `app` only draws the game and passes the clicks here.
+"""
+
+import numpy as np
+
+if __package__ == "":
+    # when imported from __main__
+    import savegame
+    import gamelogic
+    import solver
+else:
+    # when imported from __init__
+    from . import savegame, gamelogic, solver
+
+# new state of a field after the first click of the button (second click empties the field)
+BUTTON_TARGET = {1: 2, 3: 1}  # left => full; right => X
+
+
+class Engine:
+    """
+    Wraps one SaveGame and the rules of the game. Positions of the fields are given as (x, y),
+    same as in `gamelogic.change_field()` - x is the column and y is the row.
+    """
+    def __init__(self, game: savegame.SaveGame):
+        self.game = game
+        if game.guesses.any():  # guesses restored from a save file
+            gamelogic.update_conflicts(game)
+
+    def apply_move(self, x: int, y: int, button: int) -> bool:
+        """
+        Applies one move (mouse button 1 or 3 at the field). Moves outside of the board are ignored.
+        Returns whether the move was applied.
+        """
+        rows, cols = self.game.board.shape
+        if button not in BUTTON_TARGET or not (0 <= x < cols and 0 <= y < rows):
+            return False
+
+        gamelogic.change_field(self.game, np.array((x, y)), button)
+        return True
+
+    def apply_moves(self, moves: np.ndarray) -> int:
+        """
+        Applies many moves at once, with the same result as calling `apply_move()` on them one by one.
+        Takes an array of shape (moves, 3) with columns x, y and button. Returns the number of applied moves.
+
+        Only the last run of clicks by the same button matters for every field. The run starts from
+        the current state of the field only when there were no other clicks on that field before,
+        after a click by the other button the field is never in the target state of this button.
+        """
+        cols = self.game.board.shape[1]
+        cell, button = sort_moves(moves, self.game.board.shape)
+        if len(cell) == 0:
+            return 0
+
+        last, clicks, first_run = last_runs(cell, button)
+        field_y, field_x = np.divmod(cell[last], cols)
+        target = np.where(button[last] == 1, BUTTON_TARGET[1], BUTTON_TARGET[3])
+
+        starts_in_target = first_run & (self.game.guesses[field_y, field_x] == target)
+        self.game.guesses[field_y, field_x] = np.where((clicks % 2 == 1) != starts_in_target, target, 0)
+
+        for row in np.unique(field_y).tolist():
+            self.game.mark_dirty(row=row)
+            gamelogic.update_conflicts(self.game, row=row)
+        for col in np.unique(field_x).tolist():
+            self.game.mark_dirty(col=col)
+            gamelogic.update_conflicts(self.game, col=col)
+
+        return len(cell)
+
+    def solve(self):
+        """
+        Overwrites the guesses with the correct solution.
+        """
+        self.game.get_solution(True)
+
+    def hint(self, time_limit: float = 0.02):
+        """
+        Finds one field that can be proven from the current guesses and the hints (see `solver.next_move()`)
+        and adds a text explaining why (`reason`). Returns None if no field is found.
+        """
+        rows = [hints for hints, _ in self.game.y]
+        cols = [hints for hints, _ in self.game.x]
+        move = solver.next_move(solver.from_guesses(self.game.guesses), rows, cols, time_limit)
+        if move is None:
+            return None
+
+        line = None
+        if move["axis"] is not None:
+            name = "Row" if move["axis"] == 0 else "Column"
+            hints = (rows if move["axis"] == 0 else cols)[move["index"]]
+            line = f"{name} {move['index'] + 1} ({' '.join(map(str, hints))})"
+
+        if move["conflict"]:
+            move["reason"] = f"{line} cannot be completed, check your guesses"
+        else:
+            field = f"field {move['col'] + 1}, {move['row'] + 1}"
+            value = "full" if move["value"] == solver.FULL else "X"
+            if move["axis"] is None:
+                move["reason"] = f"The {field} has to be {value}, otherwise some line cannot be completed"
+            else:
+                move["reason"] = f"{line} forces the {field} to be {value}"
+
+        return move
+
+    def is_won(self) -> bool:
+        """
+        Checks whether the game is finished. Only the rows/columns changed since the last call are checked.
+        """
+        return gamelogic.validate_game(self.game, incremental=True)
+
+    def state(self) -> dict:
+        """
+        Returns a copy of the current guesses, completeness of rows/columns, rows/columns that cannot
+        be completed anymore and whether the game is finished.
+        """
+        won = self.is_won()
+        row_conflicts, col_conflicts = self.game.conflicts
+        return {
+            "guesses": self.game.guesses.copy(),
+            "rows": np.array([complete for _, complete in self.game.y], bool),
+            "cols": np.array([complete for _, complete in self.game.x], bool),
+            "row_conflicts": row_conflicts.copy(),
+            "col_conflicts": col_conflicts.copy(),
+            "won": won
+        }
+
+
+def sort_moves(moves: np.ndarray, dims: tuple) -> tuple:
+    """
+    Drops the moves outside of the board, then groups them by the field (keeping their order).
+    Returns the flat index of the field (y * columns + x) and the button of every move.
+    """
+    moves = np.asarray(moves, int).reshape(-1, 3)
+    x, y, button = moves.T
+
+    valid = np.isin(button, list(BUTTON_TARGET)) & (0 <= x) & (x < dims[1]) & (0 <= y) & (y < dims[0])
+    cell = y[valid] * dims[1] + x[valid]
+    order = np.argsort(cell, kind="stable")
+
+    return cell[order], button[valid][order]
+
+
+def last_runs(cell: np.ndarray, button: np.ndarray) -> tuple:
+    """
+    Takes the moves sorted by the field and finds the last run of clicks by the same button at every field.
+    Returns the index of the last move at every field, number of clicks in its run and whether
+    the run is the first one at that field.
+    """
+    index = np.arange(len(cell))
+    new_cell = np.r_[True, cell[1:] != cell[:-1]]
+    new_run = new_cell | np.r_[True, button[1:] != button[:-1]]
+
+    cell_start = np.maximum.accumulate(np.where(new_cell, index, 0))
+    run_start = np.maximum.accumulate(np.where(new_run, index, 0))
+
+    last = np.flatnonzero(np.r_[cell[1:] != cell[:-1], True])
+    return last, last - run_start[last] + 1, run_start[last] == cell_start[last]
@@ -7,9 +7,11 @@ import numpy as np
 if __package__ == "":
     # when imported from __main__
     import savegame
+    import bitboard
+    import solver
 else:
     # when imported from __init__
-    from . import savegame
+    from . import savegame, bitboard, solver
 
 
 def change_field(game: savegame.SaveGame, pos: np.ndarray, button: int):
@@ -29,46 +31,165 @@ def change_field(game: savegame.SaveGame, pos: np.ndarray, button: int):
     else:
         game.guesses[row, col] = 1 if current_state != 1 else 0
 
+    game.mark_dirty(row, col)
+    update_conflicts(game, row, col)
 
-def validate_game(game: savegame.SaveGame) -> bool:
+
+def update_conflicts(game: savegame.SaveGame, row: int = None, col: int = None):
+    """
+    Checks whether the row and/or column can still be completed with the current guesses (full fields and X)
+    and flags the impossible ones in `game.conflicts`. Without any parameters, all lines are checked
+    (needed after the guesses are replaced).
+    """
+    rows, cols = game.conflicts
+    if row is None and col is None:
+        for i in range(len(rows)):
+            update_conflicts(game, row=i)
+        for i in range(len(cols)):
+            update_conflicts(game, col=i)
+        return
+
+    if row is not None:
+        line = tuple(solver.from_guesses(game.guesses[row]).tolist())
+        rows[row] = not solver.line_feasible(line, tuple(game.y[row][0]))
+    if col is not None:
+        line = tuple(solver.from_guesses(game.guesses[:, col]).tolist())
+        cols[col] = not solver.line_feasible(line, tuple(game.x[col][0]))
+
+
+def validate_game(game: savegame.SaveGame, incremental: bool = False) -> bool:
     """
     Check if the game is finished. In case of an exact match, rows/columns are not checked at all.
     Otherwise, function iterates over rows/columns and sets the data about their "completeness".
     This feature is used when coloring the hints for completed rows.
+
+    If `incremental` is set to True, only the rows/columns marked as dirty are checked
+    (see `validate_changes()`).
     """
-    reference = game.get_solution(False)
-    solution = game.guesses.copy()
+    if incremental:
+        return validate_changes(game)
 
-    # replace all `no guess` (0) to `X` (1)
-    solution[solution == 0] = 1
+    # preallocated buffers, no temporary arrays are created for the whole board
+    solution = game.buffer("solution")
+    filled = game.buffer("filled", bool)
+    bits = game.bitboard
 
-    # quick check... equality
-    if np.array_equal(reference, solution):
-        return True
+    # replace all `no guess` (0) to `X` (1)
+    np.maximum(game.guesses, 1, out=solution)
+    np.equal(solution, 2, out=filled)
+
+    # quick check... equality with the board, either by words of packed bits or field by field
+    if bits is not None:
+        exact_rows = bits.matching_lines(filled)
+        if exact_rows.all():
+            return True
+        exact_cols = bits.matching_lines(filled, True)
+    else:
+        np.not_equal(filled, game.board, out=filled)
+        if not filled.any():
+            return True
+        exact_rows, exact_cols = np.zeros(len(game.y), bool), np.zeros(len(game.x), bool)
 
-    # check by iterating the matrix
+    # check by iterating the matrix... lines equal to the board are complete without checking the hints
     dims = solution.shape
     is_correct = True
 
     for row, i in zip(solution, range(dims[0])):
-        row_complete = validate_row(row, game.y[i])
+        row_complete = bool(exact_rows[i]) or validate_row(row, game.y[i])
         is_correct = row_complete and is_correct  # one False will set is_correct = False
 
         game.y[i] = game.y[i][0], row_complete  # overwrite in case this was not fulfilled before
 
     for col, i in zip(solution.T, range(dims[1])):
-        col_complete = validate_row(col, game.x[i])
+        col_complete = bool(exact_cols[i]) or validate_row(col, game.x[i])
         is_correct = col_complete and is_correct
 
         game.x[i] = game.x[i][0], col_complete
 
+    # every line is up-to-date now, incremental validation can continue from here
+    game.validation["completed"] = sum(complete for _, complete in game.x + game.y)
+    game.validation["rows"].clear()
+    game.validation["cols"].clear()
+
     return is_correct
 
 
-def validate_row(row: np.ndarray, hints: tuple) -> bool:
+def validate_changes(game: savegame.SaveGame) -> bool:
+    """
+    Incremental version of `validate_game()`. Only the rows/columns marked by `SaveGame.mark_dirty()`
+    are checked again, whether the game is finished is then answered from the count of completed lines.
+    Used in the game loop, where nothing changes in most of the frames.
+    """
+    validation = game.validation
+    bits = game.bitboard
+
+    for i in validation["rows"]:
+        reference = None if bits is None else bits.line(i)
+        validation["completed"] += update_line(game.y, i, game.guesses[i], reference)
+    for i in validation["cols"]:
+        reference = None if bits is None else bits.line(i, True)
+        validation["completed"] += update_line(game.x, i, game.guesses[:, i], reference)
+
+    validation["rows"].clear()
+    validation["cols"].clear()
+
+    return validation["completed"] == len(game.x) + len(game.y)
+
+
+def update_line(lines: list, i: int, guesses: np.ndarray, reference: np.ndarray = None) -> int:
+    """
+    Checks one row/column of guesses and overwrites its "completeness".
+    Returns the change in number of completed lines (-1, 0 or 1).
+    """
+    hints, was_complete = lines[i]
+
+    # `no guess` (0) is the same as `X` (1)
+    complete = validate_row(np.maximum(guesses, 1), lines[i], reference)
+    lines[i] = hints, complete
+
+    return int(complete) - int(was_complete)
+
+
+def validate_batch(boards: np.ndarray, guesses: np.ndarray) -> tuple:
+    """
+    Checks many games with the same dimensions at once. Takes the boards and guesses stacked
+    into 3D arrays of shape (games, rows, columns).
+
+    Returns a tuple of three boolean arrays - whether the game is finished (games,),
+    completeness of rows (games, rows) and completeness of columns (games, columns).
+    """
+    boards = np.asarray(boards, bool)
+    filled = np.asarray(guesses) == 2
+    count, rows, cols = boards.shape
+
+    rows_complete = lines_complete(boards.reshape(-1, cols), filled.reshape(-1, cols)).reshape(count, rows)
+
+    boards, filled = boards.transpose(0, 2, 1), filled.transpose(0, 2, 1)
+    cols_complete = lines_complete(boards.reshape(-1, rows), filled.reshape(-1, rows)).reshape(count, cols)
+
+    won = rows_complete.all(axis=1) & cols_complete.all(axis=1)
+    return won, rows_complete, cols_complete
+
+
+def lines_complete(board: np.ndarray, filled: np.ndarray) -> np.ndarray:
+    """
+    Compares hints of every row of two 2D arrays (the board and full fields of guesses).
+    """
+    return (savegame.hints_matrix(board) == savegame.hints_matrix(filled)).all(axis=1)
+
+
+def validate_row(row: np.ndarray, hints: tuple, reference: np.ndarray = None) -> bool:
     """
     Check one row/column.
+
+    Optionally takes the same line of the board packed by `bitboard.pack_lines()`. If the guesses
+    are equal to it, the line is complete without calculating the hints.
     """
+    if reference is not None:
+        packed = bitboard.pack_lines((row == 2)[np.newaxis])[0]
+        if np.array_equal(packed, reference):
+            return True
+
     vector, _ = hints
 
     vector_guess = savegame.vector_to_hints(row - 1)
@@ -0,0 +1,49 @@
+"""
+Generator of random puzzles with a unique solution. Every puzzle is drawn from its own random stream
+(derived from the seed and the index of the puzzle), so the same seed always gives the same puzzles,
+no matter how many worker processes generate them or in which order they finish.
+"""
+
+import numpy as np
+
+if __package__ == "":
+    # when imported from __main__
+    import savegame
+else:
+    # when imported from __init__
+    from . import savegame
+
+# limit of the search when checking uniqueness, a time limit would make the result depend on the machine
+GUESS_LIMIT = 1000
+
+
+def puzzle_rng(seed: int, index: int) -> np.random.Generator:
+    """
+    Independent random stream of one puzzle, same as the `index`-th child of `np.random.SeedSequence(seed)`.
+    """
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+
+
+def generate_board(seed: int, index: int, sizes: tuple = (10, 10), density: float = 0.5):
+    """
+    Generates one puzzle. Number of rows and columns is drawn from the range `sizes` (both inclusive),
+    fields are full with the probability `density`. Ambiguous boards are adjusted by `SaveGame.make_unique()`
+    or drawn again. Returns the board, or None if no unique board is found in `UNIQUE_ATTEMPTS` attempts.
+    """
+    rng = puzzle_rng(seed, index)
+    game = savegame.SaveGame(tuple(rng.integers(sizes[0], sizes[1], size=2, endpoint=True)))
+
+    for _ in range(savegame.UNIQUE_ATTEMPTS):
+        game.randomize(density, rng=rng)
+        if game.make_unique(time_limit=None, max_guesses=GUESS_LIMIT):
+            return game.board
+
+    return None
+
+
+def generate_task(task: tuple) -> tuple:
+    """
+    Generates one puzzle in a worker process, returns its index together with the board.
+    """
+    seed, index, sizes, density = task
+    return index, generate_board(seed, index, sizes, density)
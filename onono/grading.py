@@ -0,0 +1,185 @@
+"""
+Grading of the puzzles by difficulty. Grades are computed by the solver (how many passes over the lines
+and how many guesses it needs) and cached in a sidecar index in the `saves` directory,
+so that only new or changed files are graded again.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+if __package__ == "":
+    # when imported from __main__
+    import savegame
+    import image
+    import binformat
+else:
+    # when imported from __init__
+    from . import savegame, image, binformat
+
+INDEX_NAME = ".grades.json"
+
+# upper bounds of the score for every difficulty
+DIFFICULTY = [(2., "easy"), (4., "medium"), (20., "hard"), (float("inf"), "expert")]
+
+# puzzles converted from images are graded with the same parameters the menu uses
+IMAGE_DIMS = (10, 10)
+IMAGE_FILLED = 0.7
+
+
+def grade_board(board: np.ndarray, time_limit: float = 10.) -> dict:
+    """
+    Grades one board. Score is the number of passes over all lines needed by the line solver,
+    every guess of the backtracking adds 10 more.
+    """
+    game = savegame.SaveGame()
+    game.set_board(board)
+    result = game.solve(max_solutions=2, time_limit=time_limit)
+
+    rows, cols = game.board.shape
+    score = result["iterations"] / (rows + cols) + 10 * result["guesses"]
+
+    if result["timeout"]:
+        difficulty = "unknown"
+    elif not result["unique"]:
+        difficulty = "ambiguous"
+    else:
+        difficulty = next(name for limit, name in DIFFICULTY if score < limit)
+
+    return {
+        "rows": rows,
+        "cols": cols,
+        "density": round(float(game.board.mean()), 3),
+        "unique": result["unique"],
+        "iterations": result["iterations"],
+        "guesses": result["guesses"],
+        "score": round(score, 2),
+        "difficulty": difficulty
+    }
+
+
+def grade_file(path: Path) -> dict:
+    """
+    Loads and grades a puzzle (text or binary file) or an image (PNG). Returns None for invalid files.
+    Used by the worker processes of the command line tool.
+    """
+    board = load_board(path)
+    return None if board is None else grade_board(board)
+
+
+def load_board(path: Path):
+    """
+    Loads the board of a puzzle (text or binary file) or converts an image (PNG) with the parameters
+    of the menu. Returns None for invalid files.
+    """
+    if path.suffix == ".png":
+        try:
+            return image.apply_threshold(image.image_prepare(path, IMAGE_DIMS), IMAGE_FILLED)
+        except (OSError, ValueError, AssertionError):  # also truncated or unidentified images
+            return None
+
+    game = savegame.SaveGame()
+    return game.board if game.load_path(path) else None
+
+
+def file_hash(path: Path) -> str:
+    """
+    Hash of the file content.
+    """
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+class GradeIndex:
+    """
+    Sidecar index of grades, keyed by the path relative to the `saves` directory.
+    Every entry stores the modification time and hash of the graded file.
+    """
+    def __init__(self, directory: Path = None):
+        self.directory = savegame.get_saves_dir() if directory is None else directory
+        self.path = self.directory / INDEX_NAME
+        try:
+            self.entries = json.loads(self.path.read_text())
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+
+    def key(self, path: Path) -> str:
+        """
+        Key of the file in the index.
+        """
+        return path.resolve().relative_to(self.directory.resolve()).as_posix()
+
+    def get(self, path: Path):
+        """
+        Returns the cached grade of the file, or None if the file was not graded or changed since.
+        """
+        entry = self.entries.get(self.key(path))
+        if entry is None or entry["mtime"] != path.stat().st_mtime:
+            return None
+        return entry["grade"]
+
+    def stale(self, paths: list) -> list:
+        """
+        Returns the files that need to be graded. Files with a new modification time but the same
+        content (hash) only get their time updated.
+        """
+        result = []
+        for path in paths:
+            entry = self.entries.get(self.key(path))
+            mtime = path.stat().st_mtime
+
+            if entry is not None and entry["mtime"] == mtime:
+                continue
+            if entry is not None and entry["hash"] == file_hash(path):
+                entry["mtime"] = mtime
+                continue
+            result.append(path)
+
+        return result
+
+    def set(self, path: Path, grade: dict):
+        """
+        Stores the grade of the file.
+        """
+        self.entries[self.key(path)] = {"mtime": path.stat().st_mtime, "hash": file_hash(path), "grade": grade}
+
+    def save(self):
+        """
+        Writes the index, the file is replaced at once (readers never see a partially written index).
+        """
+        temp = self.path.with_name(f"{INDEX_NAME}.{os.getpid()}.tmp")
+        temp.write_text(json.dumps(self.entries, indent=1))
+        os.replace(temp, self.path)
+
+
+def get_library() -> list:
+    """
+    Returns all puzzles of the game - text and binary files in `saves` and PNG images in `saves/images`.
+    """
+    directory = savegame.get_saves_dir()
+    puzzles = list(directory.glob("*.csv")) + list(directory.glob("*" + binformat.EXTENSION))
+    return sorted(puzzles) + sorted((directory / "images").glob("*.png"))
+
+
+def get_labels(subdir: str = "", images: bool = False) -> dict:
+    """
+    Reads the cached grades (nothing is graded here) and returns a short label for every graded puzzle
+    in the directory, eg. {"Game01": "10x10 easy"}. Used by the menu.
+    """
+    index = GradeIndex()
+    directory = (index.directory / "images" if images else index.directory) / subdir
+    labels = {}
+
+    if images:
+        paths = list(directory.glob("*.png"))
+    else:
+        paths = list(directory.glob("*.csv")) + list(directory.glob("*" + binformat.EXTENSION))
+
+    for path in paths:
+        grade = index.get(path)
+        if grade is not None:
+            labels[path.stem] = f"{grade['rows']}x{grade['cols']} {grade['difficulty']}"
+
+    return labels
@@ -2,6 +2,7 @@
 Definitions for various GUI elements to be used in other game modules.
 """
 
+import os
 from pathlib import Path
 
 import numpy as np
@@ -11,6 +12,8 @@ COLOR = {
     "empty": "#AAAAAA",
     "full": "#F0AB00",
     "x-placeholder": "#000000",
+    "hint": "#1E6FD9",
+    "conflict": "#D62828",
     "black": "#000000"
 }
 
@@ -20,6 +23,9 @@ COLOR = {
 FONT_PATH = (Path(__file__).parent.parent / "data" / "fonts" / "ComicNeue-Regular.ttf").resolve()
 FONT_MONO_PATH = (Path(__file__).parent.parent / "data" / "fonts" / "NotoMono-Regular.ttf").resolve()
 
+# debug keys in the game (F12 solves the game), enabled by the environment variable ONONO_DEBUG=1
+DEBUG = os.environ.get("ONONO_DEBUG") == "1"
+
 MENU_CAPTION = "Onono! The Puzzle Game - Menu"
 GAME_CAPTION = "Onono! The Puzzle Game"
 
@@ -28,6 +34,8 @@ SCREEN_SIZE = [600, 700]
 MENU_INITIAL_COORDS = [50., 300.]
 MENU_ITEM = [300., 50.]
 MENU_MARGIN = [0., 10.]
+PREVIEW_SIZE = MENU_ITEM[1] - 2 * MENU_MARGIN[1]  # thumbnails of the puzzles left of the menu items
+MENU_ROWS = int((SCREEN_SIZE[1] - MENU_INITIAL_COORDS[1]) // MENU_ITEM[1])  # visible items of a long list
 
 BLOCK_SIZE = np.array([45., 45.])
 BLOCK_MARGIN = np.array([1., 1.])
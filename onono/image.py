@@ -2,42 +2,105 @@
 Module for loading images and turning them into game puzzles with variable threshold.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import io
 from pathlib import Path
 
 import numpy as np
-from PIL import Image, ImageOps, UnidentifiedImageError
+from PIL import Image, ImageOps
 
+if __package__ == "":
+    # when imported from __main__
+    import library
+    import imagecache
+else:
+    # when imported from __init__
+    from . import library, imagecache
 
-def image_prepare(path: Path, dims: tuple) -> np.ndarray:
+
+# number of pixels of the source kept for every field (in both directions) when a big image is decoded
+# in a lower resolution or reduced before the conversion
+REDUCE_MARGIN = 4
+
+# maximum memory taken by the decoded image in bytes, bigger images are refused (ValueError)
+MEMORY_LIMIT = 256 * 1024 * 1024
+
+# modes that cannot be reduced directly, converted to grayscale first
+NO_REDUCE_MODES = ("1", "P", "PA", "I;16")
+
+
+def image_prepare(path: Path, dims: tuple, memory_limit: int = MEMORY_LIMIT) -> np.ndarray:
     """
     Opens the image and does various basic operations. Separated from `load_image()`
     for testing purposes.
     """
-    image = Image.open(path)
+    with open_image(path, [dims], memory_limit) as image:
+        # cannot upscale image
+        assert image.size[0] >= dims[0] and image.size[1] >= dims[1]
 
-    # cannot upscale image
-    assert image.size[0] >= dims[0] and image.size[1] >= dims[1]
+        return fit_image(image, dims)
 
-    image = ImageOps.grayscale(image)
-    image = ImageOps.fit(image, dims)
-    image = np.asarray(image)
+
+def open_image(path: Path, sizes: list, memory_limit: int = MEMORY_LIMIT) -> Image.Image:
+    """
+    Opens the image for the conversion into the sizes (width, height). When all the sizes are much smaller,
+    JPEG images are decoded directly in a lower resolution (`Image.draft()`), other formats are decoded fully.
+    Raises ValueError when the decoded image would take more than `memory_limit` bytes.
+    """
+    try:
+        image = Image.open(path)
+    except Image.DecompressionBombError as error:
+        raise ValueError("Image is too big") from error
+
+    sizes = [size for size in sizes if image.size[0] >= size[0] and image.size[1] >= size[1]]
+    scale = min((min(image.size[0] / w, image.size[1] / h) for w, h in sizes), default=1) / REDUCE_MARGIN
+    if scale > 1:
+        image.draft("L", (int(image.size[0] / scale), int(image.size[1] / scale)))
+
+    # one byte per pixel for the single band modes, four otherwise (also the bands of RGB are stored in four bytes)
+    if image.size[0] * image.size[1] * (1 if image.mode in ("1", "L", "P") else 4) > memory_limit:
+        image.close()
+        raise ValueError("Image is too big")
 
     return image
 
 
+def fit_image(image: Image.Image, size: tuple) -> np.ndarray:
+    """
+    Converts the image into grayscale and fits it into the size (width, height). A big image is first reduced
+    (`Image.reduce()`, averages of the blocks of pixels), so that the other operations work only on a small copy.
+    """
+    factor = int(min(image.size[0] / size[0], image.size[1] / size[1]) / REDUCE_MARGIN)
+    if factor > 1:
+        image = ImageOps.grayscale(image) if image.mode in NO_REDUCE_MODES else image
+        image = image.reduce(factor)
+
+    image = ImageOps.grayscale(image)
+    image = ImageOps.fit(image, size)
+    return np.asarray(image)
+
+
 def load_image(name: str, dims: tuple = (10, 10), percent_filled: float = 0.7):
     """
     Loads a PNG image from the `saves/images` directory, performs various operations
     and returns it as an array. In case something goes wrong, returns None.
+
+    Converted images are cached (see `imagecache`), the image is not opened again when its content is the same.
     """
     name += ".png"
     path = Path(__file__).parent.parent
     path = (path / 'saves' / 'images' / name).resolve()
     try:
-        image = image_prepare(path, dims)
-        image = apply_threshold(image, percent_filled)
+        data = path.read_bytes()
+        key = imagecache.cache_key(data, dims, percent_filled)
+        image = imagecache.get(key)
+        if image is None:
+            image = image_prepare(io.BytesIO(data), dims)
+            image = apply_threshold(image, percent_filled)
+            imagecache.put(key, image)
         return image
-    except (FileNotFoundError, UnidentifiedImageError, ValueError, AssertionError):
+    except (OSError, ValueError, AssertionError):  # also truncated or unidentified images
         return None
 
 
@@ -47,36 +110,119 @@ def apply_threshold(image: np.ndarray, expected_filled: float = 0.7, return_thre
     closest to the expected one. Returns the matrix after threshold is applied.
 
     if `return_threshold` is set to True, returns a tuple of the image and pixel value threshold.
-    """
-    total_px = image.shape[0] * image.shape[1]
 
-    prev_threshold = 128
-    threshold = 128
-    closest_match = 1.
-    while True:
-        mask = image > threshold
-        filled = mask.sum() / total_px
-        difference = filled - expected_filled
+    A stack of images (3D array) is processed at once, with a threshold for every image (`expected_filled`
+    can then be an array as well).
+
+    The threshold is searched from 128 in the direction of the expected ratio, one step at a time, until the ratio
+    stops getting closer. The ratio of every threshold is known from the histogram of the image, so the search
+    ends right at the first threshold that crosses the expected ratio. As in the original step by step search,
+    the mask is the one of that threshold and the returned threshold is the previous one.
+    """
+    image = np.asarray(image)
+    stack = image if image.ndim == 3 else image[np.newaxis]
+    total_px = stack.shape[1] * stack.shape[2]
 
-        if threshold == 128 or abs(difference) <= closest_match:
-            closest_match = abs(difference)
-        else:
-            break
+    # ratio of the pixels above every threshold 0..255, never increasing
+    filled = pixels_above(stack) / total_px
+    expected = np.asarray(expected_filled, float).reshape(-1, 1)
 
-        next_threshold = threshold - 1 if difference < 0 else threshold + 1
-        if next_threshold == prev_threshold or next_threshold < 0 or next_threshold > 255:
-            break
+    # thresholds with at least the expected ratio form a prefix of 0..255
+    enough = (filled - expected >= 0).sum(axis=1)
+    down = filled[:, 128] - expected[:, 0] < 0
+    threshold = np.where(down, np.maximum(enough - 1, 0), np.minimum(enough, 255))
+    prev_threshold = np.where(down, threshold + 1, threshold - 1)
 
-        prev_threshold = threshold
-        threshold = next_threshold
+    mask = stack > threshold[:, np.newaxis, np.newaxis]
+    if image.ndim != 3:
+        mask, prev_threshold = mask[0], int(prev_threshold[0])
 
     return (mask, prev_threshold) if return_threshold else mask
 
 
+def pixels_above(stack: np.ndarray) -> np.ndarray:
+    """
+    Counts the pixels greater than every threshold 0..255 in every image of the stack,
+    from one histogram per image. Returns an array of shape (images, 256).
+    """
+    if stack.dtype == np.uint8:
+        buckets, size = stack.reshape(len(stack), -1), 256
+    else:
+        # pixel is above the integer threshold exactly when its ceiling is, values out of the range share a bucket
+        buckets, size = np.clip(np.ceil(stack), -1, 256).astype(np.int64).reshape(len(stack), -1) + 1, 258
+
+    offsets = np.arange(len(stack))[:, np.newaxis] * size
+    histogram = np.bincount((buckets + offsets).ravel(), minlength=len(stack) * size).reshape(len(stack), size)
+
+    below = np.cumsum(histogram, axis=1)  # pixels lower or equal to the bucket
+    if size == 258:
+        below = below[:, 1:257]  # buckets -1..256 => values 0..255
+    return buckets.shape[1] - below
+
+
+def image_boards(path: Path, shapes: list, fills: list, memory_limit: int = MEMORY_LIMIT) -> list:
+    """
+    Converts one image into puzzles of all the shapes (rows, columns) and fill ratios at once - the image
+    is opened once and every shape is thresholded for all the ratios together. Returns the boards ordered
+    by shape and then by ratio, None for the shapes larger than the image (cannot upscale).
+    """
+    boards = []
+    with open_image(path, [(cols, rows) for rows, cols in shapes], memory_limit) as image:
+        for rows, cols in shapes:
+            if image.size[0] < cols or image.size[1] < rows:
+                boards += [None] * len(fills)
+                continue
+
+            fitted = fit_image(image, (cols, rows))
+            boards += list(apply_threshold(np.broadcast_to(fitted, (len(fills), rows, cols)), np.asarray(fills)))
+
+    return boards
+
+
+def mosaic(path: Path, grid: tuple, shape: tuple, percent_filled: float = 0.7, local: bool = False) -> np.ndarray:
+    """
+    Cuts the image into a grid (rows, columns) of puzzles of the shape (rows, columns), together the puzzles
+    show the whole image. Threshold is found for the whole image (so the puzzles fit together exactly)
+    or for every puzzle separately if `local` is set. Returns the boards as an array of shape
+    (grid rows, grid columns, rows, columns).
+
+    The image is decoded once into one buffer, the tiles are averaged into the fields by a pool of threads,
+    every thread works on views of the shared buffer (no copies).
+    """
+    rows, cols = grid[0] * shape[0], grid[1] * shape[1]
+    with open_image(path, [(cols, rows)]) as image:
+        # cannot upscale image
+        assert image.size[0] >= cols and image.size[1] >= rows
+
+        margin = max(1, min(REDUCE_MARGIN, image.size[0] // cols, image.size[1] // rows))
+        pixels = fit_image(image, (cols * margin, rows * margin))
+
+    fields = np.empty((rows, cols))
+    with ThreadPoolExecutor() as pool:
+        list(pool.map(partial(average_tile, pixels, fields, shape, margin), np.ndindex(*grid)))
+
+    if local:
+        tiles = fields.reshape((grid[0], shape[0], grid[1], shape[1])).swapaxes(1, 2).reshape((-1, *shape))
+        return apply_threshold(tiles, percent_filled).reshape((*grid, *shape))
+
+    boards = apply_threshold(fields, percent_filled)
+    return np.ascontiguousarray(boards.reshape((grid[0], shape[0], grid[1], shape[1])).swapaxes(1, 2))
+
+
+def average_tile(pixels: np.ndarray, fields: np.ndarray, shape: tuple, margin: int, tile: tuple):
+    """
+    Averages one tile of the mosaic, every field of the result covers `margin` x `margin` pixels.
+    Runs in the threads of `mosaic()`, writes into its part of the shared `fields`.
+    """
+    top, left = tile[0] * shape[0], tile[1] * shape[1]
+    view = pixels[top * margin:(top + shape[0]) * margin, left * margin:(left + shape[1]) * margin]
+    fields[top:top + shape[0], left:left + shape[1]] = view.reshape((shape[0], margin, shape[1], margin)).mean(axis=(1, 3))
+
+
 def get_images(subdir: str = ""):
     """
-    Opens the `saves/images` directory and returns the list of all PNG files.
+    Returns the sorted names of all PNG files in the `saves/images` directory. The listing is a cached tuple,
+    see `library.listing()`.
     """
     path = Path(__file__).parent.parent
-    path = (path / 'saves' / 'images' / subdir).resolve().glob("*.png")
-    return [x.stem for x in path if x.is_file()]
+    return library.listing(path / 'saves' / 'images' / subdir, (".png",))
@@ -0,0 +1,102 @@
+"""
+Cache of the images converted into puzzles (see `image.load_image()`). Boards are stored in the binary format
+(`saves/.imagecache`) under the hash of the image content, dimensions, ratio of full fields and the version
+of the conversion, so a repeated load of the same image does not open it at all. Files are written atomically
+(see `binformat.write()`), the cache can be shared by more processes. When the cache grows over `SIZE_LIMIT`,
+the least recently used boards (by the modification time, updated on every hit) are removed. The size
+is checked once per `EVICT_INTERVAL` stored boards, so that the directory is not scanned on every write.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+if __package__ == "":
+    # when imported from __main__
+    import binformat
+else:
+    # when imported from __init__
+    from . import binformat
+
+CACHE_DIR = Path(__file__).parent.parent / "saves" / ".imagecache"
+
+# version of the conversion, change when `image_prepare()` or `apply_threshold()` gives different boards
+VERSION = 2
+
+# total size of the cached files in bytes, the cache is shrunk to `SHRINK_RATIO` of it when exceeded
+SIZE_LIMIT = 4 * 1024 * 1024
+SHRINK_RATIO = 0.8
+
+# every file takes at least one block of the disk (boards themselves have only tens of bytes),
+# so the limit also caps the number of files to `SIZE_LIMIT // BLOCK_SIZE`
+BLOCK_SIZE = 4096
+
+# size of the cache is checked at the first and then every `EVICT_INTERVAL`-th board stored by the process
+EVICT_INTERVAL = 64
+
+_stored = {"count": 0}  # boards stored by this process
+
+
+def cache_key(data: bytes, dims: tuple, percent_filled: float) -> str:
+    """
+    Key of the converted image, `data` is the content of the image file.
+    """
+    params = f"{VERSION}|{int(dims[0])}x{int(dims[1])}|{float(percent_filled)!r}|"
+    return hashlib.sha256(params.encode() + data).hexdigest()
+
+
+def get(key: str, directory: Path = None):
+    """
+    Returns the cached board, or None when it is not in the cache (or the file is damaged).
+    """
+    path = (directory or CACHE_DIR) / f"{key}{binformat.EXTENSION}"
+    try:
+        board = binformat.read(path)[0]
+        os.utime(path)  # recently used
+    except (OSError, ValueError):
+        return None
+
+    return board
+
+
+def put(key: str, board, directory: Path = None, limit: int = SIZE_LIMIT):
+    """
+    Stores the board into the cache and removes the least recently used boards when the cache is too big.
+    Errors of the disk are ignored, the board is converted again next time.
+    """
+    directory = directory or CACHE_DIR
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        binformat.write(directory / f"{key}{binformat.EXTENSION}", board, atomic=True)
+
+        if _stored["count"] % EVICT_INTERVAL == 0:
+            evict(directory, limit)
+        _stored["count"] += 1
+    except OSError:
+        pass
+
+
+def evict(directory: Path, limit: int = SIZE_LIMIT):
+    """
+    Removes the least recently used boards until the cache takes at most `SHRINK_RATIO` of the limit
+    (every board counted as whole blocks). Boards removed by another process in the meantime are skipped.
+    """
+    entries = []
+    with os.scandir(directory) as scan:
+        for entry in scan:
+            if entry.name.endswith(binformat.EXTENSION):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, max(1, -(-stat.st_size // BLOCK_SIZE)) * BLOCK_SIZE, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    if total <= limit:
+        return
+
+    for _, size, path in sorted(entries):
+        if total <= limit * SHRINK_RATIO:
+            break
+        Path(path).unlink(missing_ok=True)
+        total -= size
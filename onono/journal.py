@@ -0,0 +1,176 @@
+"""
+Journal of the game session. Every move is appended to a file by a background thread (the game loop only
+puts it into a queue and never waits for the disk), so that an unfinished game can be resumed after
+the window is closed. The file starts with a snapshot of the game:
+
+    magic (4 bytes) | version (2) | elapsed time (8) | snapshot length (4) | snapshot (see `binformat`) | moves
+
+Every move takes 9 bytes - time since the start of the game (float32), x, y (uint16) and the mouse button (uint8).
+After many moves, the journal is replaced by a new snapshot, so that resuming stays fast.
+"""
+
+import os
+import queue
+import struct
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+if __package__ == "":
+    # when imported from __main__
+    import savegame
+    import engine
+    import binformat
+else:
+    # when imported from __init__
+    from . import savegame, engine, binformat
+
+MAGIC = b"ONOJ"
+VERSION = 1
+SESSION_NAME = ".session.journal"
+
+HEADER = struct.Struct("<4sHdI")
+MOVE = np.dtype([("time", "<f4"), ("x", "<u2"), ("y", "<u2"), ("button", "u1")])
+
+# written moves are forced to the disk at most once per interval (in seconds)
+FSYNC_INTERVAL = 1.
+
+# number of moves after which the journal is replaced by a new snapshot
+SNAPSHOT_INTERVAL = 10000
+
+
+class Journal:
+    """
+    Writes the moves of one game into a journal file. Methods `record()`, `snapshot()` and `close()`
+    are called from the game loop, the file is written only by the background thread.
+    """
+    def __init__(self, path: Path, game: savegame.SaveGame, elapsed: float = 0.):
+        self.path = Path(path)
+        self.game = game
+        self.moves = 0  # moves since the last snapshot
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.work, name="journal", daemon=True)
+
+        self.snapshot(elapsed)
+        self.thread.start()
+
+    def record(self, x: int, y: int, button: int, elapsed: float):
+        """
+        Adds one applied move (see `engine.Engine.apply_move()`) made `elapsed` seconds after the start of the game.
+        """
+        self.queue.put(("move", np.array((elapsed, x, y, button), MOVE).tobytes()))
+        self.moves += 1
+        if self.moves >= SNAPSHOT_INTERVAL:
+            self.snapshot(elapsed)
+
+    def snapshot(self, elapsed: float):
+        """
+        Replaces the journal by the current state of the game (needed when the guesses are changed
+        other way than by moves).
+        """
+        self.moves = 0
+        data = binformat.dumps(self.game.board, self.game.guesses)
+        self.queue.put(("snapshot", HEADER.pack(MAGIC, VERSION, elapsed, len(data)) + data))
+
+    def close(self, delete: bool = False):
+        """
+        Writes the remaining moves and stops the background thread. With `delete` set (game is finished),
+        the journal is removed.
+        """
+        self.queue.put(("close", delete))
+        self.thread.join()
+
+    def work(self):
+        """
+        Loop of the background thread. Everything waiting in the queue is written at once,
+        `os.fsync()` is called at most once per `FSYNC_INTERVAL`.
+        """
+        file = None
+        synced = True
+        last_sync = time.monotonic()
+
+        while True:
+            try:
+                batch = [self.queue.get(timeout=FSYNC_INTERVAL)]
+            except queue.Empty:
+                batch = []
+            while not self.queue.empty():
+                batch.append(self.queue.get())
+
+            for kind, data in batch:
+                if kind == "snapshot":
+                    file = self.rewrite(file, data)
+                elif kind == "move":
+                    file.write(data)
+                    synced = False
+                else:
+                    self.finish(file, data)
+                    return
+
+            file.flush()
+            if not synced and time.monotonic() - last_sync >= FSYNC_INTERVAL:
+                os.fsync(file.fileno())
+                synced, last_sync = True, time.monotonic()
+
+    def rewrite(self, file, data: bytes):
+        """
+        Writes a new journal starting by the snapshot and replaces the old one at once.
+        Returns the new file, the following moves are appended to it.
+        """
+        if file is not None:
+            file.close()
+
+        temp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with temp.open("wb") as new:
+            new.write(data)
+            new.flush()
+            os.fsync(new.fileno())
+        os.replace(temp, self.path)
+
+        return self.path.open("ab")
+
+    def finish(self, file, delete: bool):
+        """
+        Closes the journal file, see `close()`.
+        """
+        file.flush()
+        os.fsync(file.fileno())
+        file.close()
+        if delete:
+            self.path.unlink(missing_ok=True)
+
+
+def load(path: Path):
+    """
+    Resumes the game from a journal - the snapshot is loaded and the following moves are replayed at once.
+    Returns the game and the elapsed time of the game in seconds, or None when there is no valid journal.
+    """
+    try:
+        data = Path(path).read_bytes()
+        magic, version, elapsed, size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            return None
+        board, guesses, _ = binformat.loads(data[HEADER.size:HEADER.size + size])
+    except (FileNotFoundError, struct.error, ValueError):
+        return None
+
+    game = savegame.SaveGame()
+    game.set_board(board)
+    game.guesses[:] = guesses
+
+    moves = data[HEADER.size + size:]
+    moves = np.frombuffer(moves, MOVE, count=len(moves) // MOVE.itemsize)  # unfinished last move is skipped
+    if len(moves) > 0:
+        engine.Engine(game).apply_moves(np.column_stack((moves["x"], moves["y"], moves["button"])))
+        elapsed = float(moves["time"][-1])
+
+    return game, elapsed
+
+
+def session_path() -> Path:
+    """
+    Returns the path of the journal of the game played in the GUI.
+    """
+    return savegame.get_saves_dir() / SESSION_NAME
@@ -0,0 +1,86 @@
+"""
+Cached listings of the puzzles in the `saves` directories. Every directory is scanned once and scanned again
+only when its modification time changes (a file was added, removed or renamed) or when it is invalidated,
+the listings are served from memory (checking the modification time is a single `stat` call).
+"""
+
+import os
+import time
+from pathlib import Path
+
+# directory changed less than this ago (in nanoseconds) is scanned again next time, another file could have been
+# added within the resolution of the modification time
+RECENT = 2 * 10 ** 9
+
+_indexes = {}  # DirectoryIndex of every listed directory and suffixes
+
+
+class DirectoryIndex:
+    """
+    Sorted names (without the suffix) of the files with given suffixes in one directory.
+    Hidden files are skipped, same as by `Path.glob()`.
+    """
+    def __init__(self, directory: Path, suffixes: tuple):
+        self.directory = Path(directory)
+        self.suffixes = tuple(suffixes)
+        self.mtime = None  # modification time of the directory at the last scan (None => scan again)
+        self.names = ()
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Scans the directory again if it changed since the last scan. Returns whether it was scanned.
+        """
+        try:
+            mtime = self.directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if not force and mtime == self.mtime:
+            return False
+
+        self.names = self.scan() if mtime is not None else ()
+        self.mtime = mtime if mtime is None or time.time_ns() - mtime > RECENT else None
+        return True
+
+    def scan(self) -> tuple:
+        """
+        Lists the matching files in the directory, a name with more suffixes is listed once.
+        """
+        names = set()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                suffix = next((suffix for suffix in self.suffixes if entry.name.endswith(suffix)), None)
+                if suffix is not None and not entry.name.startswith(".") and entry.is_file():
+                    names.add(entry.name[:-len(suffix)])
+
+        return tuple(sorted(names))
+
+    def invalidate(self):
+        """
+        Forces a new scan at the next refresh.
+        """
+        self.mtime = None
+
+
+def listing(directory: Path, suffixes: tuple) -> tuple:
+    """
+    Returns the sorted names of the files with given suffixes in the directory. The cached tuple itself
+    is returned, it stays the same object until the directory changes.
+    """
+    directory = Path(os.path.abspath(directory))
+    key = directory, tuple(suffixes)
+    if key not in _indexes:
+        _indexes[key] = DirectoryIndex(directory, suffixes)
+
+    index = _indexes[key]
+    index.refresh()
+    return index.names
+
+
+def invalidate(directory: Path = None):
+    """
+    Forces a new scan of the directory (all directories by default), eg. after a file was written into it.
+    """
+    directory = None if directory is None else Path(os.path.abspath(directory))
+    for index in _indexes.values():
+        if directory is None or index.directory == directory:
+            index.invalidate()
@@ -13,15 +13,19 @@ if __package__ == "":
     import savegame
     import app
     import image
+    import grading
+    import prefetch
+    import journal
+    import thumbnails
     from gui_definitions import \
         COLOR, FONT_PATH, MENU_CAPTION, SCREEN_SIZE, \
-        MENU_INITIAL_COORDS, MENU_ITEM, MENU_MARGIN
+        MENU_INITIAL_COORDS, MENU_ITEM, MENU_MARGIN, MENU_ROWS, PREVIEW_SIZE
 else:
     # when imported from __init__
-    from . import savegame, app, image
+    from . import savegame, app, image, grading, prefetch, journal, thumbnails
     from .gui_definitions import \
         COLOR, FONT_PATH, MENU_CAPTION, SCREEN_SIZE, \
-        MENU_INITIAL_COORDS, MENU_ITEM, MENU_MARGIN
+        MENU_INITIAL_COORDS, MENU_ITEM, MENU_MARGIN, MENU_ROWS, PREVIEW_SIZE
 
 GAME_INFO = ["Created by Simon Ruzicka @ FIT CTU, 2022",
              "",
@@ -29,6 +33,12 @@ GAME_INFO = ["Created by Simon Ruzicka @ FIT CTU, 2022",
              "Color the squares by using your mouse buttons",
              "Use the hints on the left and top to solve puzzles"]
 
+# rendered texts of the menu items kept between frames (the cache is cleared when it gets bigger)
+TEXT_CACHE_SIZE = 256
+
+# keys moving the selection in the menu list
+KEY_MOVES = {pg.K_UP: -1, pg.K_DOWN: 1, pg.K_PAGEUP: -MENU_ROWS, pg.K_PAGEDOWN: MENU_ROWS}
+
 
 def prepare_screen() -> pg.Surface:
     """
@@ -54,7 +64,17 @@ def run():
         "button_clicked": None,  # stores number of selected button (0, 1, ..., n - 1)
         "button_hover": None,
         "menu": "default",
+        "resume": journal.session_path().is_file(),  # unfinished game can be resumed (last button)
+        "labels": {},  # difficulty of the puzzles in the load menus, read from the grade index
+        "scroll": 0,  # first visible item of a long list
+        "filter": "",  # text typed in the load menus, only the items containing it are shown
+        "filtered": None,  # last filtered list of items, see `filter_items()`
+        "font": pg.font.Font(FONT_PATH, 25),
+        "texts": {},  # rendered texts of the menu items, see `render_item()`
+        "thumbnails": thumbnails.Thumbnails(),  # made in the background, see `draw_previews()`
+        "previews": {},  # rendered thumbnails
         "info": False,
+        "prefetch": prefetch.Prefetcher(app.prepare_game),  # random games prepared in the background
         "screen": prepare_screen()
     }
 
@@ -107,18 +127,75 @@ def draw_info(data: dict):
 
 def draw_menu_items(items: list, data: dict):
     """
-    Draws the menu items given in a list.
+    Draws the visible part of the menu items given in a list (at most `MENU_ROWS` items from the scroll
+    position), so that drawing takes the same time for any number of items.
     """
-    font = pg.font.Font(FONT_PATH, 25)
-
     coords = MENU_INITIAL_COORDS + np.array(MENU_MARGIN)
-    i = 0
-    for item in items:
+    first, last = data["scroll"], min(len(items), data["scroll"] + MENU_ROWS)
+
+    for i in range(first, last):
+        item = items[i]
         color = COLOR["full"] if i == data["button_hover"] else COLOR["black"]
-        text = font.render(item, True, color, COLOR["background"])
-        data["screen"].blit(text, coords)
+        if item in data["labels"]:
+            item = f"{item} ({data['labels'][item]})"
+        data["screen"].blit(render_item(data, item, color), coords)
         coords[1] += MENU_ITEM[1]
-        i += 1
+
+    if data["menu"] in ["load_save", "load_img"]:
+        draw_previews(data, items[first:last])
+
+    # position in a long list
+    if len(items) > MENU_ROWS:
+        text = render_item(data, f"{first + 1}-{last} / {len(items)}", COLOR["empty"])
+        data["screen"].blit(text, (SCREEN_SIZE[0] - text.get_width() - MENU_MARGIN[1], MENU_INITIAL_COORDS[1]))
+
+
+def draw_previews(data: dict, items: list):
+    """
+    Draws the thumbnails of the visible puzzles left of the items. Thumbnails are made in the background
+    (see `thumbnails`), the missing ones appear in the following frames as soon as they are ready.
+    """
+    kind = "image" if data["menu"] == "load_img" else "save"
+    boards = data["thumbnails"].request([(kind, item) for item in items])
+
+    coords = np.array(MENU_INITIAL_COORDS) + (-PREVIEW_SIZE - MENU_MARGIN[1], MENU_MARGIN[1])
+    for item, board in zip(items, boards):
+        if board is not None:
+            data["screen"].blit(render_preview(data, (kind, item), board), coords)
+        coords[1] += MENU_ITEM[1]
+
+
+def render_preview(data: dict, key: tuple, board: np.ndarray) -> pg.Surface:
+    """
+    Renders the thumbnail of a puzzle (full fields are black) scaled to fit into `PREVIEW_SIZE`,
+    or returns it from the cache.
+    """
+    previews = data["previews"]
+    if key not in previews:
+        if len(previews) >= TEXT_CACHE_SIZE:
+            previews.clear()
+
+        colors = np.array([pg.Color(COLOR["background"])[:3], pg.Color(COLOR["black"])[:3]], np.uint8)
+        surface = pg.surfarray.make_surface(colors[board.T.astype(int)])  # surfaces are indexed by (x, y)
+        scale = PREVIEW_SIZE / max(board.shape)
+        surface = pg.transform.scale(surface, (int(board.shape[1] * scale), int(board.shape[0] * scale)))
+        pg.draw.rect(surface, COLOR["empty"], surface.get_rect(), 1)
+        previews[key] = surface
+
+    return previews[key]
+
+
+def render_item(data: dict, text: str, color: str) -> pg.Surface:
+    """
+    Renders the text of a menu item, or returns it from the cache.
+    """
+    texts = data["texts"]
+    if (text, color) not in texts:
+        if len(texts) >= TEXT_CACHE_SIZE:
+            texts.clear()
+        texts[text, color] = data["font"].render(text, True, color, COLOR["background"])
+
+    return texts[text, color]
 
 
 def get_menu_items(data: dict) -> list:
@@ -126,13 +203,13 @@ def get_menu_items(data: dict) -> list:
     Loads the needed menu items based on `menu` parameter in the given dictionary.
     """
     if data["menu"] == "default":
-        return data["buttons"]
+        return data["buttons"] + (["Resume Game"] if data["resume"] else [])
 
     if data["menu"] == "load_save":
-        return savegame.get_savegames()
+        return filter_items(data, savegame.get_savegames())
 
     if data["menu"] == "load_img":
-        return image.get_images()
+        return filter_items(data, image.get_images())
 
     if data["menu"] == "save_prompt":
         return ["Save Game", "Don't Save"]
@@ -140,6 +217,22 @@ def get_menu_items(data: dict) -> list:
     return []
 
 
+def filter_items(data: dict, items: tuple) -> tuple:
+    """
+    Keeps only the items containing the typed filter (case insensitive). The result is reused until
+    the filter or the listing (a cached tuple, see `library.listing()`) changes.
+    """
+    if not data["filter"]:
+        return items
+
+    cached = data["filtered"]
+    if cached is None or cached[0] is not items or cached[1] != data["filter"]:
+        text = data["filter"].lower()
+        data["filtered"] = items, data["filter"], tuple(item for item in items if text in item.lower())
+
+    return data["filtered"][2]
+
+
 def get_subtitle(data: dict) -> str:
     """
     Loads the needed game subtitle based on `menu` parameter in the given dictionary.
@@ -148,7 +241,7 @@ def get_subtitle(data: dict) -> str:
         return "Save Game!"
 
     if data["menu"] in ["load_save", "load_img"]:
-        return "Load Game!"
+        return f"Find: {data['filter']}" if data["filter"] else "Load Game!"
 
     return "The Puzzle Game"
 
@@ -165,6 +258,10 @@ def get_events(data: dict):
             register_mouse(data, event, True)
         if event.type == pg.MOUSEMOTION:
             register_mouse(data, event, False)
+        if event.type == pg.MOUSEWHEEL:
+            scroll(data, data["scroll"] - event.__dict__["y"])
+        if event.type == pg.KEYDOWN:
+            register_key(data, event)
 
 
 def register_mouse(data: dict, event: pg.event, click: bool):
@@ -172,14 +269,15 @@ def register_mouse(data: dict, event: pg.event, click: bool):
     Register mouse movements, activate hover effect and detect potential click.
     """
     pos = np.array(event.__dict__["pos"])
-    pos = (pos - MENU_INITIAL_COORDS)
+    pos = pos - MENU_INITIAL_COORDS
     pos_item = pos // MENU_ITEM
     pos %= MENU_ITEM
 
-    max_buttons = len(get_menu_items(data))
+    # only the visible items can be clicked
+    visible = min(MENU_ROWS, len(get_menu_items(data)) - data["scroll"])
 
     # outside of menu items
-    if pos_item[1] not in range(max_buttons) or pos_item[0] != 0:
+    if pos_item[1] not in range(visible) or pos_item[0] != 0:
         data["button_hover"] = None
         return
 
@@ -188,9 +286,83 @@ def register_mouse(data: dict, event: pg.event, click: bool):
         return
 
     if click:
-        data["button_clicked"] = int(pos_item[1])
+        data["button_clicked"] = data["scroll"] + int(pos_item[1])
 
-    data["button_hover"] = int(pos_item[1])
+    data["button_hover"] = data["scroll"] + int(pos_item[1])
+
+
+def register_key(data: dict, event: pg.event):
+    """
+    Keyboard navigation - arrows and page up/down move the selection, enter clicks it.
+    In the load menus, typed text filters the items, escape clears the filter or returns to the main menu.
+    """
+    key, char = event.__dict__["key"], event.__dict__.get("unicode", "")
+    count = len(get_menu_items(data))
+    hover = data["button_hover"]
+    loading = data["menu"] in ["load_save", "load_img"]
+
+    if key in KEY_MOVES and count > 0:
+        move_hover(data, KEY_MOVES[key], count)
+    elif key in [pg.K_RETURN, pg.K_KP_ENTER] and hover is not None:
+        data["button_clicked"] = hover
+    elif key == pg.K_ESCAPE and loading:
+        if data["filter"]:
+            set_filter(data, "")
+        else:
+            open_menu(data, "default")
+    elif key == pg.K_BACKSPACE and loading:
+        set_filter(data, data["filter"][:-1])
+    elif loading and char.isprintable() and char:
+        set_filter(data, data["filter"] + char)
+
+
+def move_hover(data: dict, step: int, count: int):
+    """
+    Moves the selection by `step` items, the first move selects the first (or the last) item.
+    """
+    hover = data["button_hover"]
+    if hover is None:
+        hover = 0 if step > 0 else count - 1
+    else:
+        hover = min(max(hover + step, 0), count - 1)
+
+    data["button_hover"] = hover
+    scroll_to(data, hover)
+
+
+def set_filter(data: dict, text: str):
+    """
+    Changes the filter of the load menus, the list starts from the top again.
+    """
+    data["filter"] = text
+    data["button_hover"] = None
+    data["scroll"] = 0
+
+
+def scroll(data: dict, first: int):
+    """
+    Scrolls the list to the given first visible item (limited to the items in the list).
+    """
+    data["scroll"] = max(0, min(first, len(get_menu_items(data)) - MENU_ROWS))
+
+
+def scroll_to(data: dict, item: int):
+    """
+    Scrolls the list just enough to make the item visible.
+    """
+    if item < data["scroll"]:
+        scroll(data, item)
+    elif item >= data["scroll"] + MENU_ROWS:
+        scroll(data, item - MENU_ROWS + 1)
+
+
+def open_menu(data: dict, menu: str):
+    """
+    Switches to another menu, with the list scrolled to the top and without any filter.
+    """
+    data["menu"] = menu
+    data["filtered"] = None
+    set_filter(data, "")
 
 
 def handle_click(data: dict):
@@ -213,32 +385,54 @@ def handle_click(data: dict):
         if selected == 0:
             stamp = datetime.now()
             data["game"].save_game(str(stamp))
-        data["menu"] = "default"
+        open_menu(data, "default")
         selected = None
 
     # play (random save)
     if selected == 0:
-        data["game"] = app.run(data["screen"])  # run the game
+        data["game"] = app.run(data["screen"], data["prefetch"].get())  # run the game
         pg.display.set_caption(MENU_CAPTION)
-        data["menu"] = "save_prompt"
+        open_menu(data, "save_prompt")
+        data["resume"] = False  # journal of the finished game is deleted
 
     # load game
     elif selected == 1:
-        data["menu"] = "load_save"
+        open_menu(data, "load_save")
+        data["labels"] = grading.get_labels()
     # load game from image
     elif selected == 2:
-        data["menu"] = "load_img"
+        open_menu(data, "load_img")
+        data["labels"] = grading.get_labels(images=True)
     # info
     elif selected == 3:
         data["info"] = True
     # quit game
     elif selected == 4:
+        data["prefetch"].stop()
+        data["thumbnails"].close()
         pg.quit()
         sys.exit(0)
+    # resume the unfinished game
+    elif selected == 5:
+        resume_game(data)
 
     data["button_clicked"] = None
 
 
+def resume_game(data: dict):
+    """
+    Resumes the game from the session journal. Invalid journal just hides the button.
+    """
+    session = journal.load(journal.session_path())
+    data["resume"] = False
+    if session is None:
+        return
+
+    data["game"] = app.run(data["screen"], *session)
+    pg.display.set_caption(MENU_CAPTION)
+    open_menu(data, "save_prompt")
+
+
 def load_game(data: dict, selected: int):
     """
     Loads the game at given position in the list. Based on parameter *menu* in data dict, looks for an image
@@ -247,16 +441,18 @@ def load_game(data: dict, selected: int):
     load_image = data["menu"] == "load_img"
     game = savegame.SaveGame()
     if load_image:
-        success = game.load_from_image(get_menu_items(data)[selected])
+        success = game.load_from_image(get_menu_items(data)[selected], unique=True)
         if success:
             app.run(data["screen"], game)
         else:
-            app.run(data["screen"])
+            app.run(data["screen"], data["prefetch"].get())
     else:
         success = game.load_game(get_menu_items(data)[selected])
         if success:
             app.run(data["screen"], game)
         else:
-            app.run(data["screen"])
+            app.run(data["screen"], data["prefetch"].get())
 
-    data["menu"] = "default"
+    open_menu(data, "default")
+    data["labels"] = {}
+    data["resume"] = False
@@ -0,0 +1,166 @@
+"""
+Pack of many puzzles in one file. The file is opened once and mapped into memory (`mmap`),
+any puzzle is then read directly from its offset without reading the rest of the file:
+
+    header | puzzle 0 | puzzle 1 | ... | index
+
+Header contains the magic bytes, version, number of puzzles and the offset of the index. Index is an array
+of (offset, rows, columns) of every puzzle, written at the end when all puzzles are known (the header is then
+updated). Every puzzle is stored as the board packed into bits, followed by the number of hints of every row
+and column and the hints themselves (all as uint16).
+
+Pack of a mosaic (puzzles that together show one picture, see `image.mosaic()`) has the `FLAG_MOSAIC` flag
+and the number of rows and columns of the grid right after the index, puzzles are ordered row by row.
+"""
+
+import io
+import mmap
+from pathlib import Path
+
+import numpy as np
+
+if __package__ == "":
+    # when imported from __main__
+    import savegame
+else:
+    # when imported from __init__
+    from . import savegame
+
+MAGIC = b"ONOP"
+VERSION = 1
+EXTENSION = ".onpack"
+
+HEADER = np.dtype([("magic", "S4"), ("version", "<u2"), ("flags", "<u2"), ("count", "<u8"), ("index", "<u8")])
+INDEX = np.dtype([("offset", "<u8"), ("rows", "<u4"), ("cols", "<u4")])
+HINT_DTYPE = np.dtype("<u2")
+GRID = np.dtype([("rows", "<u4"), ("cols", "<u4")])
+
+# flags in the header
+FLAG_MOSAIC = 1
+
+
+class PackWriter:
+    """
+    Writes the puzzles into a new pack file one by one. Use as a context manager
+    or call `close()` at the end, the pack is not valid before that.
+
+    With `grid` (rows, columns), the pack is a mosaic - puzzles are the tiles of the grid, row by row.
+    """
+    def __init__(self, path: Path, grid: tuple = None):
+        self.file = io.BufferedWriter(io.FileIO(path, "w"))
+        self.file.write(np.zeros(1, HEADER).tobytes())  # replaced by `close()`
+        self.entries = []  # key, offset, rows and columns of every puzzle
+        self.grid = grid
+
+    def add(self, board: np.ndarray, key: int = None):
+        """
+        Adds one puzzle. Puzzles are ordered by `key` in the pack (order of adding by default).
+        """
+        board = np.asarray(board, bool)
+        row_offsets, row_lengths = savegame.board_to_hints(board)
+        col_offsets, col_lengths = savegame.board_to_hints(board.T)
+
+        self.entries.append((len(self.entries) if key is None else key, self.file.tell(), *board.shape))
+        self.file.write(np.packbits(board, axis=None).tobytes())
+        self.file.write(np.concatenate((np.diff(row_offsets), np.diff(col_offsets))).astype(HINT_DTYPE).tobytes())
+        self.file.write(np.concatenate((row_lengths, col_lengths)).astype(HINT_DTYPE).tobytes())
+
+    def close(self):
+        """
+        Writes the index at the end of the file and updates the header.
+        """
+        self.entries.sort()
+        index = np.array([entry[1:] for entry in self.entries], INDEX)
+        flags = 0 if self.grid is None else FLAG_MOSAIC
+        header = np.array([(MAGIC, VERSION, flags, len(index), self.file.tell())], HEADER)
+
+        self.file.write(index.tobytes())
+        if self.grid is not None:
+            self.file.write(np.array([tuple(self.grid)], GRID).tobytes())
+        self.file.seek(0)
+        self.file.write(header.tobytes())
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class PackReader:
+    """
+    Opens a pack file for reading. Opening does not read any puzzles, `load()` reads only the one puzzle.
+    Raises ValueError when the file is not a valid pack.
+    """
+    def __init__(self, path: Path):
+        with Path(path).open("rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.map) < HEADER.itemsize:
+            self.map.close()
+            raise ValueError("File is too short")
+
+        header = np.frombuffer(self.map, HEADER, 1)[0]
+        count, offset, flags = int(header["count"]), int(header["index"]), int(header["flags"])
+        grid_size = GRID.itemsize if flags & FLAG_MOSAIC else 0
+        if header["magic"] != MAGIC or header["version"] != VERSION or \
+                offset + count * INDEX.itemsize + grid_size > len(self.map):
+            del header
+            self.map.close()
+            raise ValueError("Not a valid pack")
+
+        self.index = np.frombuffer(self.map, INDEX, count, offset)
+
+        # rows and columns of the mosaic, None for other packs
+        self.grid = None
+        if grid_size:
+            grid = np.frombuffer(self.map, GRID, 1, offset + count * INDEX.itemsize)[0]
+            self.grid = int(grid["rows"]), int(grid["cols"])
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def load(self, number: int) -> tuple:
+        """
+        Reads the puzzle at the position `number`. Returns the board and its hints in the format
+        of `SaveGame.runs` (see `savegame.board_to_hints()`).
+        """
+        offset, rows, cols = (int(value) for value in self.index[number])
+        cells = rows * cols
+        packed = (cells + 7) // 8
+
+        board = np.unpackbits(np.frombuffer(self.map, np.uint8, packed, offset), count=cells)
+        counts = np.frombuffer(self.map, HINT_DTYPE, rows + cols, offset + packed)
+        lengths = np.frombuffer(self.map, HINT_DTYPE, int(counts.sum()), offset + packed + counts.nbytes)
+
+        offsets = np.zeros(rows + cols + 1, int)
+        np.cumsum(counts, out=offsets[1:])
+        row_runs = offsets[:rows + 1], lengths[:offsets[rows]].astype(int)
+        col_runs = offsets[rows:] - offsets[rows], lengths[offsets[rows]:].astype(int)
+
+        return board.reshape((rows, cols)).astype(bool), {"y": row_runs, "x": col_runs}
+
+    def picture(self) -> np.ndarray:
+        """
+        Joins the boards of a mosaic into the whole picture. Raises ValueError when the pack is not a mosaic
+        or its tiles do not fit together.
+        """
+        if self.grid is None or len(self) != self.grid[0] * self.grid[1]:
+            raise ValueError("Not a mosaic")
+
+        rows = [[self.load(row * self.grid[1] + col)[0] for col in range(self.grid[1])] for row in range(self.grid[0])]
+        return np.block(rows)
+
+    def close(self):
+        """
+        Closes the memory map (all boards returned by `load()` are copies and stay valid).
+        """
+        del self.index
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
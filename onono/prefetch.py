@@ -0,0 +1,55 @@
+"""
+Prepares new games in a background thread while the current game is played,
+so that the next game starts without waiting for its generation.
+"""
+
+import queue
+import threading
+
+# number of prepared games waiting for a player
+QUEUE_SIZE = 2
+
+# how often the waiting thread checks whether it should stop (in seconds)
+POLL_INTERVAL = 0.1
+
+
+class Prefetcher:
+    """
+    Keeps a small queue of games filled by a background thread. Games are made by `factory`
+    (a function without parameters, eg. `app.prepare_game`).
+    """
+    def __init__(self, factory, size: int = QUEUE_SIZE):
+        self.factory = factory
+        self.games = queue.Queue(size)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.work, name="prefetch", daemon=True)
+        self.thread.start()
+
+    def work(self):
+        """
+        Loop of the background thread - makes a game and waits until there is a free place in the queue.
+        """
+        while not self.stopped.is_set():
+            game = self.factory()
+            while not self.stopped.is_set():
+                try:
+                    self.games.put(game, timeout=POLL_INTERVAL)
+                    break
+                except queue.Full:
+                    continue
+
+    def get(self):
+        """
+        Returns a prepared game. When none is ready yet (eg. right after the start), the game is made now.
+        """
+        try:
+            return self.games.get_nowait()
+        except queue.Empty:
+            return self.factory()
+
+    def stop(self):
+        """
+        Stops the background thread and waits for it (at most until the game in progress is made).
+        """
+        self.stopped.set()
+        self.thread.join()
@@ -9,100 +9,237 @@ import numpy as np
 if __package__ == "":
     # when imported from __main__
     import image
+    import bitboard
+    import solver
+    import binformat
+    import library
 else:
     # when imported from __init__
-    from . import image
+    from . import image, bitboard, solver, binformat, library
 
+# three states of a guess fit into one byte
+GUESS_DTYPE = np.int8
 
-class SaveGame:
+# how many random boards are tried before giving up on a unique solution
+UNIQUE_ATTEMPTS = 20
+
+
+class SaveGame:  # pylint: disable=too-many-instance-attributes
     """
     Stores the state of the game board, especially important when loading/saving the game.
     """
-    def __init__(self, dims: tuple = (10, 10)):
+    def __init__(self, dims: tuple = (10, 10), use_bitboard: bool = False):
         self.board = np.zeros(dims, bool)
-        self.guesses = np.zeros(dims, int)  # 0 => empty; 1 => X; 2 => full
+        self.guesses = np.zeros(dims, GUESS_DTYPE)  # 0 => empty; 1 => X; 2 => full
         self.x = []  # list of row vectors and whether the guesses are complete
         self.y = []  # eg. [([1, 2, 3], False), ([10], True), ([0], True)]
 
+        # rows/columns changed since the last incremental validation and number of completed lines
+        self.validation = {"rows": set(), "cols": set(), "completed": 0}
+        # rows and columns that cannot be completed with the current guesses
+        self.conflicts = np.zeros(0, bool), np.zeros(0, bool)
+        # board packed into bits (faster validation of large boards), None unless enabled by `use_bitboard`
+        self.bitboard = bitboard.BitBoard(self.board) if use_bitboard else None
+        # hints of columns ("x") and rows ("y") as a pair of arrays, see `board_to_hints()`
+        self.runs = {}
+        # preallocated arrays reused between validations, see `buffer()`
+        self.buffers = {}
+
         self.overwrite_lengths()
 
     def load_game(self, name: str) -> bool:
         """
-        Loads a text file in the `saves` directory and stores the data into the board.
+        Loads a save file in the `saves` directory and stores the data into the board.
+        Binary file (see `binformat`) is preferred to the text file with the same name.
         """
-        name += ".csv"
         path = Path(__file__).parent.parent
         path = (path / 'saves' / name).resolve()
+        binary = path.with_name(path.name + binformat.EXTENSION)
+        return self.load_path(binary if binary.is_file() else path.with_name(path.name + ".csv"))
+
+    def load_path(self, path: Path) -> bool:
+        """
+        Loads a text or binary file (by its suffix) at any path (used by `load_game()` and the command line tools).
+        Guesses stored in a binary file are restored as well, stored hints are used instead of calculating them.
+        """
+        guesses, runs = None, None
         try:
-            self.board = np.loadtxt(path, dtype=bool, delimiter=',')
-            self.overwrite_lengths()
-            return True
+            if Path(path).suffix == binformat.EXTENSION:
+                board, guesses, runs = binformat.read(path)
+            else:
+                board = np.loadtxt(path, dtype=bool, delimiter=',', ndmin=2)
         except (FileNotFoundError, ValueError):
             return False
 
+        self.set_board(board, runs)
+        if guesses is not None:
+            self.guesses = guesses.astype(GUESS_DTYPE)
+        return True
+
     def load_from_image(
             self,
             image_name: str,
             percent_filled: float = 0.7,
-            dims: tuple = (10, 10)
+            dims: tuple = (10, 10),
+            unique: bool = False
     ) -> bool:
         """
         Loads an image file in the `saves/images` directory, converts it using the `image` module
         and stores the data into the board.
+
+        If `unique` is set to True, the board is adjusted to have only one solution (see `make_unique()`).
         """
         board = image.load_image(image_name, dims, percent_filled)
         # checking valid input
         if board is not None:
-            self.board = board
-            self.guesses = np.zeros(board.shape, int)
-            self.overwrite_lengths()
+            self.set_board(board)
+
+            if unique:
+                self.make_unique()
 
         return board is not None
 
-    def save_game(self, name: str):
+    def load_pack(self, pack, number: int) -> bool:
+        """
+        Loads the puzzle at position `number` of an open pack (see `pack.PackReader`), together with
+        its precomputed hints.
         """
-        Saves the data from the board into a text file in the `saves` directory.
+        if not 0 <= number < len(pack):
+            return False
+
+        self.set_board(*pack.load(number))
+        return True
+
+    def set_board(self, board: np.ndarray, runs: dict = None):
+        """
+        Replaces the board (with possibly different dimensions) and clears the guesses.
+        Hints of the board can be given in the format of the `runs` attribute, they are calculated otherwise.
+        """
+        self.board = np.asarray(board, bool)
+        self.guesses = np.zeros(self.board.shape, GUESS_DTYPE)
+        self.overwrite_lengths(runs)
+
+    def save_game(self, name: str, binary: bool = False):
         """
-        name += ".csv"
+        Saves the data from the board into a text file (binary file if `binary` is set)
+        in the `saves` directory.
+        """
+        name += binformat.EXTENSION if binary else ".csv"
         path = Path(__file__).parent.parent
         path = (path / 'saves' / name).resolve()
+        self.save_path(path)
 
-        # X expects type `int` for some reason
-        # noinspection PyTypeChecker
-        np.savetxt(path, X=self.board, fmt='%.0d', delimiter=',')
+    def save_path(self, path: Path, guesses: bool = False):
+        """
+        Saves the board into a text or binary file (by its suffix) at any path (used by `save_game()`
+        and the command line tools). Guesses (and the hints) can be stored only in a binary file.
+        """
+        if Path(path).suffix == binformat.EXTENSION:
+            binformat.write(path, self.board, self.guesses if guesses else None, self.runs)
+        else:
+            # X expects type `int` for some reason
+            # noinspection PyTypeChecker
+            np.savetxt(path, X=self.board, fmt='%.0d', delimiter=',')
 
-    def calculate_lengths(self, transposed: bool):
+        library.invalidate(Path(path).parent)
+
+    def calculate_lengths(self, transposed: bool, runs: tuple = None):
         """
-        Calculates and overwrites the lengths at x or y-axis on the board.
+        Calculates and overwrites the lengths at x or y-axis on the board (or takes the precomputed `runs`).
 
-        Returns a list of lists due to varying lengths.
+        Returns a list of lists due to varying lengths. The compact form of the same hints
+        (see `board_to_hints()`) is kept in the `runs` attribute.
         """
         board = self.board.transpose() if transposed else self.board
-        result = []
-
-        for row in board:
-            hints = vector_to_hints(row)
-            result.append((hints, hints == [0]))
+        offsets, lengths = board_to_hints(board) if runs is None else runs
+        self.runs["x" if transposed else "y"] = offsets, lengths
 
-        return result
+        return [(hints, hints == [0]) for hints in hints_to_lists(offsets, lengths)]
 
-    def overwrite_lengths(self):
+    def overwrite_lengths(self, runs: dict = None):
         """
         Uses `calculate_lengths` to set both x and y-axis length vectors.
         """
-        self.x = self.calculate_lengths(True)
-        self.y = self.calculate_lengths(False)
+        runs = {} if runs is None else runs
+        self.x = self.calculate_lengths(True, runs.get("x"))
+        self.y = self.calculate_lengths(False, runs.get("y"))
 
-    def randomize(self, prob: float = 0.5):
+        if self.bitboard is not None:
+            self.bitboard = bitboard.BitBoard(self.board)
+
+        self.validation["completed"] = sum(complete for _, complete in self.x + self.y)
+        self.conflicts = np.zeros(len(self.y), bool), np.zeros(len(self.x), bool)
+        self.mark_dirty()
+
+    def mark_dirty(self, row: int = None, col: int = None):
+        """
+        Marks a row and/or column to be checked again by the incremental validation.
+        Without any parameters, the whole board is marked (needed after the guesses are replaced).
+        """
+        if row is None and col is None:
+            self.validation["rows"].update(range(len(self.y)))
+            self.validation["cols"].update(range(len(self.x)))
+            return
+
+        if row is not None:
+            self.validation["rows"].add(row)
+        if col is not None:
+            self.validation["cols"].add(col)
+
+    def randomize(self, prob: float = 0.5, unique: bool = False, rng: np.random.Generator = None):
         """
         Randomizes the board while keeping the same dimensions.
         Optional parameter of probability of any field being True (between 0 and 1).
+
+        If `unique` is set to True, the board is adjusted to have only one solution (see `make_unique()`).
+        When that fails, the board is drawn again (last board is kept after `UNIQUE_ATTEMPTS` attempts).
+        Random numbers are taken from `rng` when given (reproducible boards), otherwise from `np.random`.
         """
         assert 0 <= prob <= 1, "Probability parameter not in range <0, 1>"
         dims = self.board.shape
-        self.board = np.random.rand(*dims) < prob
 
-        self.overwrite_lengths()
+        for _ in range(UNIQUE_ATTEMPTS):
+            self.board = (np.random.rand(*dims) if rng is None else rng.random(dims)) < prob
+            self.overwrite_lengths()
+
+            if not unique or self.make_unique():
+                return
+
+    def solve(self, max_solutions: int = 1, time_limit: float = None, max_guesses: int = None) -> dict:
+        """
+        Solves the puzzle only from its hints, see `solver.solve()`.
+        """
+        return solver.solve([hints for hints, _ in self.y], [hints for hints, _ in self.x], max_solutions, time_limit,
+                            max_guesses)
+
+    def make_unique(self, max_flips: int = None, time_limit: float = 0.5, max_guesses: int = None) -> bool:
+        """
+        Checks whether the hints have only one solution (search stops at the second one). Otherwise, fields
+        where the two solutions differ are flipped one by one (each field at most once), at most `max_flips` of them
+        (default is 10 % of the board). Returns whether the solution is unique now.
+        Limits of every search are passed to `solve()`.
+        """
+        if max_flips is None:
+            max_flips = max(1, self.board.size // 10)
+
+        result = self.solve(2, time_limit, max_guesses)
+        flipped = np.zeros(self.board.shape, bool)  # flipping a field back would only repeat the search
+        while result["unique"] is False and len(result["solutions"]) == 2 and flipped.sum() < max_flips:
+            first, second = result["solutions"]
+            differ = (first != second) & ~flipped
+            if (differ & first).any():
+                differ &= first  # the search tries full fields first, these are its guesses
+            fields = np.argwhere(differ)
+            if fields.size == 0:
+                break
+            row, col = fields[0]
+            self.board[row, col] = not self.board[row, col]
+            flipped[row, col] = True
+            self.overwrite_lengths()
+
+            result = self.solve(2, time_limit, max_guesses)
+
+        return bool(result["unique"])
 
     def get_solution(self, overwrite: bool = False):
         """
@@ -110,40 +247,97 @@ class SaveGame:
         If the overwrite parameter is set as `True`, the result overwrites
         the current guesses inside the object.
         """
-        guesses = 1 + self.board
-
         if overwrite:
-            self.guesses = guesses
+            # reuse the current guesses array when possible
+            if self.guesses.shape != self.board.shape or self.guesses.dtype != GUESS_DTYPE:
+                self.guesses = np.empty(self.board.shape, GUESS_DTYPE)
+            np.add(self.board, 1, out=self.guesses, dtype=GUESS_DTYPE)
+            self.mark_dirty()
+            for conflicts in self.conflicts:
+                conflicts[:] = False
+            return self.guesses
 
-        return guesses
+        return np.add(self.board, 1, dtype=GUESS_DTYPE)
+
+    def buffer(self, name: str, dtype: type = GUESS_DTYPE) -> np.ndarray:
+        """
+        Returns a preallocated array with the dimensions of the board. The array is reused between calls
+        (every frame of the game loop) instead of creating temporary arrays. Its content is undefined.
+        """
+        buf = self.buffers.get(name)
+        if buf is None or buf.shape != self.board.shape or buf.dtype != dtype:
+            buf = np.empty(self.board.shape, dtype)
+            self.buffers[name] = buf
+
+        return buf
 
 
 def vector_to_hints(vector: np.ndarray) -> list:
     """
     Takes an array of numbers and converts it into a list of hints.
     """
-    counter = 0
-    row_vector = []
+    vector = np.asarray(vector, bool)[np.newaxis]
+    return hints_to_lists(*board_to_hints(vector))[0]
+
+
+def board_to_hints(board: np.ndarray) -> tuple:
+    """
+    Calculates hints of all rows of a 2D array at once (pass the transposed board for columns).
+
+    Returns a pair of arrays `offsets` and `lengths`, the hints of row `i` are
+    `lengths[offsets[i]:offsets[i + 1]]` (empty for rows without any full fields).
+    """
+    board = np.asarray(board, bool)
+    rows, cols = board.shape
+
+    # empty field on both sides of every row, each block then has exactly one start and one end
+    padded = np.zeros((rows, cols + 2), np.int8)
+    padded[:, 1:-1] = board
+    edges = np.diff(padded, axis=1).ravel()
+
+    starts = np.flatnonzero(edges == 1)
+    lengths = np.flatnonzero(edges == -1) - starts
+
+    offsets = np.zeros(rows + 1, int)
+    np.cumsum(np.bincount(starts // (cols + 1), minlength=rows), out=offsets[1:])
+
+    return offsets, lengths
+
+
+def hints_matrix(board: np.ndarray) -> np.ndarray:
+    """
+    Calculates hints of all rows of a 2D array and returns them as a matrix padded by zeros,
+    with the shape (rows, ceil(columns / 2)). Two rows have the same hints when their rows in this matrix are equal.
+    """
+    rows, cols = np.shape(board)
+    offsets, lengths = board_to_hints(board)
 
-    for pos in vector:
-        if pos:
-            counter += 1
-        elif counter > 0:
-            row_vector.append(counter)
-            counter = 0
+    line = np.repeat(np.arange(rows), np.diff(offsets))
+    position = np.arange(len(lengths)) - offsets[line]
 
-    if len(row_vector) == 0 and counter == 0:
-        row_vector.append(0)  # no numbers in row/column
-    elif counter != 0:
-        row_vector.append(counter)  # will be last number
+    result = np.zeros((rows, (cols + 1) // 2), int)
+    result[line, position] = lengths
 
-    return row_vector
+    return result
+
+
+def hints_to_lists(offsets: np.ndarray, lengths: np.ndarray) -> list:
+    """
+    Converts the hints from `board_to_hints()` into a list of hints for every row.
+    """
+    return [lengths[start:end].tolist() or [0] for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def get_saves_dir() -> Path:
+    """
+    Returns the path of the `saves` directory.
+    """
+    return (Path(__file__).parent.parent / 'saves').resolve()
 
 
 def get_savegames(subdir: str = ""):
     """
-    Opens the `saves` directory and returns the list of all save games.
+    Returns the sorted names of all save games in the `saves` directory (text and binary files,
+    a game saved in both formats is listed once). The listing is a cached tuple, see `library.listing()`.
     """
-    path = Path(__file__).parent.parent
-    path = (path / 'saves' / subdir).resolve().glob("*.csv")
-    return [x.stem for x in path if x.is_file()]
+    return library.listing(get_saves_dir() / subdir, (".csv", binformat.EXTENSION))
@@ -0,0 +1,419 @@
+"""
+Solver of nonogram puzzles. Every row/column is solved by dynamic programming (line solver),
+deductions are propagated by a work queue of changed lines and if that is not enough,
+fields are probed (both values propagated) and the solver continues by backtracking.
+"""
+
+from collections import deque
+from functools import lru_cache, reduce
+from operator import or_
+import time
+
+import numpy as np
+
+# states of a field in the solver grid
+UNKNOWN = -1
+EMPTY = 0
+FULL = 1
+
+
+@lru_cache(maxsize=1 << 16)
+def solve_line(line: tuple, hints: tuple):
+    """
+    Takes one row/column (tuple of UNKNOWN, EMPTY or FULL) and its hints. Returns a tuple with all fields
+    that can be deduced (fields that are FULL/EMPTY in every possible placement of the blocks),
+    or None when the hints cannot be placed at all.
+
+    Dynamic programming over the positions is done on bit masks (bit `i` => field/position `i`),
+    so that one step processes the whole line at once.
+    """
+    size = len(line)
+    hints = tuple(length for length in hints if length)  # [0] => no blocks
+    cells = (1 << size) - 1
+    not_full, not_empty = line_masks(line)
+    ends = [block_ends(not_empty, length) for length in hints]
+
+    forward = forward_masks(not_full, hints, ends, size)
+    if not forward[-1] >> size & 1:
+        return None
+
+    backward = backward_masks(not_full, hints, ends, size)
+
+    # field can be empty if the blocks before and after it can be placed
+    can_empty = reduce(or_, (before & (after >> 1) for before, after in zip(forward, backward)))
+    can_empty &= not_full & cells
+
+    # field can be full if it is covered by any valid placement of some block
+    covered = 0
+    for j, length in enumerate(hints):
+        starts = block_before(forward[j], not_full)
+        starts &= (ends[j] & block_after(backward[j + 1], not_full, size)) >> length
+        covered |= smear(starts, length)
+    covered &= cells
+
+    if can_empty | covered != cells:
+        return None
+
+    return tuple(UNKNOWN if covered >> i & 1 and can_empty >> i & 1 else FULL if covered >> i & 1 else EMPTY
+                 for i in range(size))
+
+
+@lru_cache(maxsize=1 << 16)
+def line_feasible(line: tuple, hints: tuple) -> bool:
+    """
+    Checks whether the hints can still be placed into a partially filled row/column
+    (only the forward pass of `solve_line()`).
+    """
+    not_full, not_empty = line_masks(line)
+    hints = tuple(length for length in hints if length)
+    ends = [block_ends(not_empty, length) for length in hints]
+    return bool(forward_masks(not_full, hints, ends, len(line))[-1] >> len(line) & 1)
+
+
+def line_masks(line: tuple) -> tuple:
+    """
+    Converts the line into two bit masks - fields that are not full and fields that are not empty.
+    """
+    not_full = not_empty = 0
+    for i, field in enumerate(line):
+        if field != FULL:
+            not_full |= 1 << i
+        if field != EMPTY:
+            not_empty |= 1 << i
+    return not_full, not_empty
+
+
+def forward_masks(not_full: int, hints: tuple, ends: list, size: int) -> list:
+    """
+    Takes the possible end positions of every block (see `block_ends()`). Returns a list of masks,
+    `forward[j]` has the bit `i` set if the first `j` blocks can be placed into the first `i` fields.
+    """
+    forward = [fill(1, not_full << 1, size, True)]
+    for length, end in zip(hints, ends):
+        forward.append(fill((block_before(forward[-1], not_full) << length) & end, not_full << 1, size, True))
+    return forward
+
+
+def backward_masks(not_full: int, hints: tuple, ends: list, size: int) -> list:
+    """
+    Same as `forward_masks()` in the opposite direction, `backward[j]` has the bit `i` set if the blocks
+    from `j` to the end can be placed into the fields from `i` to the end.
+    """
+    backward = [fill(1 << size, not_full, size, False)]
+    for length, end in zip(hints[::-1], ends[::-1]):
+        starts = (block_after(backward[-1], not_full, size) & end) >> length
+        backward.append(fill(starts, not_full, size, False))
+    return backward[::-1]
+
+
+def block_before(forward: int, not_full: int) -> int:
+    """
+    Positions where the next block can start - after the previous blocks and one field that is not full.
+    """
+    return (forward & 1) | ((forward & not_full) << 1)
+
+
+def block_after(backward: int, not_full: int, size: int) -> int:
+    """
+    Positions where a block can end - before one field that is not full and the following blocks.
+    """
+    return (backward & (1 << size)) | ((backward >> 1) & not_full)
+
+
+def block_ends(not_empty: int, length: int) -> int:
+    """
+    Positions `i` where a block of given length can end, ie. fields from `i - length` to `i - 1` are not empty.
+    """
+    window, covered = not_empty, 1
+    while covered < length:
+        shift = min(covered, length - covered)
+        window &= window << shift
+        covered += shift
+    return window << 1
+
+
+def smear(starts: int, length: int) -> int:
+    """
+    Fields covered by blocks of given length starting at the given positions.
+    """
+    result, covered = starts, 1
+    while covered < length:
+        shift = min(covered, length - covered)
+        result |= result << shift
+        covered += shift
+    return result
+
+
+def fill(mask: int, passable: int, size: int, up: bool) -> int:
+    """
+    Extends the set bits to higher positions (lower if `up` is False) through the passable positions
+    (bit `i` of `passable` => position `i` can be reached from its neighbour). Done in log(size) steps.
+    """
+    shift = 1
+    while shift <= size:
+        if up:
+            mask |= passable & (mask << shift)
+            passable &= passable << shift
+        else:
+            mask |= passable & (mask >> shift)
+            passable &= passable >> shift
+        shift <<= 1
+    return mask & ((1 << (size + 1)) - 1)
+
+
+def propagate(grid: np.ndarray, rows: list, cols: list, queue: deque, stats: dict) -> bool:
+    """
+    Solves the lines from the queue, writes the deductions into the grid and adds the crossing
+    lines of every changed field into the queue. Lines are given as (axis, index), axis 0 for rows.
+    Returns False when a contradiction is found.
+    """
+    waiting = set(queue)
+
+    while queue:
+        line_id = queue.popleft()
+        waiting.discard(line_id)
+        axis, i = line_id
+
+        line = grid[i] if axis == 0 else grid[:, i]
+        result = solve_line(tuple(line.tolist()), rows[i] if axis == 0 else cols[i])
+        stats["lines"] += 1
+
+        if result is None:
+            return False
+
+        result = np.array(result, grid.dtype)
+        changed = np.flatnonzero(result != line)
+        if changed.size == 0:
+            continue
+
+        line[changed] = result[changed]
+        for j in changed.tolist():
+            crossing = (1 - axis, j)
+            if crossing not in waiting:
+                waiting.add(crossing)
+                queue.append(crossing)
+
+    return True
+
+
+def solve(rows: list, cols: list, max_solutions: int = 1, time_limit: float = None, max_guesses: int = None) -> dict:
+    """
+    Solves the puzzle given by hints of rows and columns (lists of lists, eg. [[1, 2], [0], [3]]).
+
+    Search stops after `max_solutions` solutions are found (use 2 to check that the solution is unique)
+    or when the `time_limit` in seconds is exceeded. Limit on the number of guesses (`max_guesses`) does not depend
+    on the speed of the machine, so the result is always the same. Returns a dict with the found solutions
+    (boolean matrices), whether the puzzle is solved/unique (None when the search stopped before it was known)
+    and the statistics - number of solved lines (`iterations`), number of guesses needed by backtracking and time.
+    """
+    start = time.perf_counter()
+    deadline = None if time_limit is None else start + time_limit
+    rows = [tuple(hints) for hints in rows]
+    cols = [tuple(hints) for hints in cols]
+
+    grid = np.full((len(rows), len(cols)), UNKNOWN, np.int8)
+    queue = deque([(0, i) for i in range(len(rows))] + [(1, i) for i in range(len(cols))])
+
+    stats = {"lines": 0, "guesses": 0, "timeout": False}
+    solutions = []
+    stack = [(grid, queue)]
+
+    while stack:
+        if deadline is not None and time.perf_counter() > deadline:
+            stats["timeout"] = True
+            break
+
+        grid, queue = stack.pop()
+        if not propagate(grid, rows, cols, queue, stats):
+            continue
+
+        field = probe(grid, rows, cols, stats, deadline)
+        if field is False:
+            continue
+        if field is None:
+            solutions.append(grid == FULL)
+            if len(solutions) >= max_solutions:
+                break
+            continue
+
+        stats["guesses"] += 1
+        push_branches(stack, grid, field)
+        if max_guesses is not None and stats["guesses"] >= max_guesses:
+            break  # the branches are not explored, uniqueness stays unknown
+
+    exhausted = not stack and not stats["timeout"]
+    return {
+        "solutions": solutions,
+        "solved": True if solutions else (False if exhausted else None),
+        "unique": is_unique(solutions, exhausted),
+        "iterations": stats["lines"],
+        "guesses": stats["guesses"],
+        "timeout": stats["timeout"],
+        "time": time.perf_counter() - start
+    }
+
+
+def probe(grid: np.ndarray, rows: list, cols: list, stats: dict, deadline: float = None):
+    """
+    Probing before backtracking... both values of unknown fields next to the known ones are propagated
+    (all unknown fields when there is none). A value that leads to a contradiction proves the other one,
+    fields with the same value in both cases are proven as well. Repeated until there is a field to guess,
+    the grid is updated in place. After the `deadline` the field is chosen without probing.
+
+    Returns False when the grid has no solution, None when it is solved, otherwise the field to guess -
+    the one whose both values prove the most other fields.
+    """
+    while True:
+        best, best_known = None, -1
+        for row, col in probed_fields(grid):
+            if deadline is not None and time.perf_counter() > deadline:
+                return best or choose_field(grid)
+            if grid[row, col] != UNKNOWN:
+                continue  # proven earlier in this pass
+
+            full, empty = probe_field(grid, rows, cols, (row, col), stats)
+            if full is None and empty is None:
+                return False
+            if full is None or empty is None:
+                grid[:] = empty if full is None else full
+                continue
+
+            agreed = (full == empty) & (full != UNKNOWN) & (grid == UNKNOWN)
+            if agreed.any():
+                grid[agreed] = full[agreed]
+                lines = deque({(0, i) for i in np.flatnonzero(agreed.any(axis=1)).tolist()} |
+                              {(1, j) for j in np.flatnonzero(agreed.any(axis=0)).tolist()})
+                if not propagate(grid, rows, cols, lines, stats):
+                    return False
+                continue
+
+            # counts are not updated after later proofs in the pass, good enough for choosing the guess
+            proven = min(np.count_nonzero(full != UNKNOWN), np.count_nonzero(empty != UNKNOWN))
+            if proven > best_known:
+                best, best_known = (row, col), proven
+
+        if best is not None or not (grid == UNKNOWN).any():
+            return best
+
+
+def probed_fields(grid: np.ndarray) -> list:
+    """
+    Unknown fields next to a known one (in a row or column), all unknown fields when there is none.
+    """
+    known = np.pad(grid != UNKNOWN, 1)
+    border = known[:-2, 1:-1] | known[2:, 1:-1] | known[1:-1, :-2] | known[1:-1, 2:]
+    return np.argwhere((grid == UNKNOWN) & border).tolist() or np.argwhere(grid == UNKNOWN).tolist()
+
+
+def probe_field(grid: np.ndarray, rows: list, cols: list, field: tuple, stats: dict) -> tuple:
+    """
+    Propagates both values of the field in copies of the grid. Returns the grids for the full and for the empty
+    value, None instead of a grid that leads to a contradiction.
+    """
+    row, col = field
+    full, empty = grid.copy(), grid.copy()
+    full[row, col], empty[row, col] = FULL, EMPTY
+    return (full if propagate(full, rows, cols, deque([(0, row), (1, col)]), stats) else None,
+            empty if propagate(empty, rows, cols, deque([(0, row), (1, col)]), stats) else None)
+
+
+def push_branches(stack: list, grid: np.ndarray, field: tuple):
+    """
+    Backtracking... adds both values of the chosen field to the stack of the search, full is tried first.
+    """
+    row, col = field
+    for value in (EMPTY, FULL):
+        branch = grid.copy()
+        branch[row, col] = value
+        stack.append((branch, deque([(0, row), (1, col)])))
+
+
+def from_guesses(guesses: np.ndarray) -> np.ndarray:
+    """
+    Converts the guesses of a player (0 => empty; 1 => X; 2 => full) into the solver grid.
+    """
+    return np.array([UNKNOWN, EMPTY, FULL], np.int8)[guesses]
+
+
+def next_move(grid: np.ndarray, rows: list, cols: list, time_limit: float = 0.02):
+    """
+    Finds one unknown field of the grid that can be proven from the known fields and the hints.
+    Returns a dict with the field (`row`, `col`), its `value` and the line (`axis`, `index`) that forced it.
+    When some line cannot be completed anymore, `conflict` is set to True and only the line is returned.
+
+    Lines are checked one by one by the line solver (repeated requests mostly hit its cache). If no single
+    line is enough, fields are probed - a value that leads to a contradiction proves the other one
+    (`axis` is None then). Returns None if nothing is found within the time limit.
+    """
+    deadline = time.perf_counter() + time_limit
+    rows = [tuple(hints) for hints in rows]
+    cols = [tuple(hints) for hints in cols]
+
+    for axis, lines in enumerate((rows, cols)):
+        for i, hints in enumerate(lines):
+            move = line_move(grid, axis, i, hints)
+            if move is not None:
+                return move
+
+    return probe_move(grid, rows, cols, deadline)
+
+
+def line_move(grid: np.ndarray, axis: int, i: int, hints: tuple):
+    """
+    Solves one line of the grid and returns the first newly deduced field (or a conflict), see `next_move()`.
+    """
+    line = tuple((grid[i] if axis == 0 else grid[:, i]).tolist())
+    result = solve_line(line, hints)
+    if result is None:
+        return {"axis": axis, "index": i, "conflict": True}
+
+    for j, (known, deduced) in enumerate(zip(line, result)):
+        if known == UNKNOWN and deduced != UNKNOWN:
+            row, col = (i, j) if axis == 0 else (j, i)
+            return {"row": row, "col": col, "value": deduced, "axis": axis, "index": i, "conflict": False}
+
+    return None
+
+
+def probe_move(grid: np.ndarray, rows: list, cols: list, deadline: float):
+    """
+    Tries both values of the unknown fields, returns the first field where one value leads to a contradiction
+    (see `next_move()`).
+    """
+    stats = {"lines": 0}
+    for row, col in np.argwhere(grid == UNKNOWN).tolist():
+        if time.perf_counter() > deadline:
+            break
+
+        full, empty = probe_field(grid, rows, cols, (row, col), stats)
+        if (full is None) != (empty is None):
+            return {"row": row, "col": col, "value": EMPTY if full is None else FULL, "axis": None, "index": None,
+                    "conflict": False}
+
+    return None
+
+
+def is_unique(solutions: list, exhausted: bool):
+    """
+    Uniqueness is known only when two solutions were found or the whole search space was explored.
+    Returns None when it is not known.
+    """
+    if len(solutions) > 1:
+        return False
+    if exhausted:
+        return len(solutions) == 1
+    return None
+
+
+def choose_field(grid: np.ndarray):
+    """
+    Chooses an unknown field for backtracking without probing, from the row with the least unknown fields
+    (the guess is then most likely to be decided by the line solver). Returns None for a solved grid.
+    """
+    unknown = grid == UNKNOWN
+    counts = unknown.sum(axis=1)
+    if not counts.any():
+        return None
+
+    row = int(np.argmin(np.where(counts > 0, counts, grid.shape[1] + 1)))
+    return row, int(np.argmax(unknown[row]))
@@ -0,0 +1,142 @@
+"""
+Thumbnails of the puzzles and images shown in the load menus. Thumbnails are made by a pool of threads
+in the background and cached on the disk (in `saves/.thumbnails`) by the hash of the file content,
+the menu only asks for the visible ones and draws them when they are ready.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+if __package__ == "":
+    # when imported from __main__
+    import savegame
+    import grading
+    import binformat
+else:
+    # when imported from __init__
+    from . import savegame, grading, binformat
+
+CACHE_NAME = ".thumbnails"
+
+# version of the thumbnails, change to make them again (part of the hash)
+VERSION = 1
+
+# bigger boards are shrunk to this number of fields on the longer side
+THUMBNAIL_FIELDS = 32
+
+THUMBNAIL_WORKERS = 2
+
+# number of thumbnails kept in memory
+MEMORY_SIZE = 4096
+
+
+class Thumbnails:
+    """
+    Makes the thumbnails in the background. Thumbnails are identified by the kind ("save" or "image")
+    and the name of the puzzle, same as the items in the load menus.
+    """
+    def __init__(self, directory: Path = None, workers: int = THUMBNAIL_WORKERS):
+        self.directory = savegame.get_saves_dir() / CACHE_NAME if directory is None else Path(directory)
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="thumbnail")
+        self.ready = {}  # finished thumbnails (None for invalid files)
+        self.pending = {}  # futures of the thumbnails that are being made
+
+    def request(self, keys: list) -> list:
+        """
+        Returns the thumbnails (boolean boards) of the puzzles, None when it is not ready yet. Missing thumbnails
+        are started in the background, waiting ones that are not requested anymore are cancelled
+        (eg. when the list is scrolled quickly). Never waits for the disk.
+        """
+        for key, future in list(self.pending.items()):
+            if future.done() or (key not in keys and future.cancel()):
+                del self.pending[key]
+
+        result = []
+        for key in keys:
+            if key not in self.ready and key not in self.pending:
+                self.pending[key] = self.pool.submit(self.make, key)
+            result.append(self.ready.get(key))
+
+        return result
+
+    def make(self, key: tuple):
+        """
+        Makes one thumbnail in a thread of the pool. When it fails, the thumbnail is stored as None
+        (same as for invalid files), so that it is not made again on every frame.
+        """
+        board = None
+        try:
+            board = make_thumbnail(find_file(*key), self.directory)
+        finally:
+            if len(self.ready) >= MEMORY_SIZE:
+                self.ready.pop(next(iter(self.ready)), None)
+            self.ready[key] = board
+
+    def close(self):
+        """
+        Cancels the waiting thumbnails and stops the threads.
+        """
+        self.pool.shutdown(cancel_futures=True)
+
+
+def find_file(kind: str, name: str) -> Path:
+    """
+    Path of the puzzle (binary file is preferred to the text file, same as by `SaveGame.load_game()`) or the image.
+    """
+    directory = savegame.get_saves_dir()
+    if kind == "image":
+        return directory / "images" / f"{name}.png"
+
+    binary = directory / f"{name}{binformat.EXTENSION}"
+    return binary if binary.is_file() else directory / f"{name}.csv"
+
+
+def make_thumbnail(path: Path, directory: Path):
+    """
+    Returns the thumbnail of a puzzle or an image from the cache directory, or makes it and stores it there.
+    Returns None for invalid files.
+    """
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+    key = hashlib.sha1(f"{VERSION}{path.suffix}".encode() + data).hexdigest()
+    cached = directory / f"{key}{binformat.EXTENSION}"
+    try:
+        return binformat.read(cached)[0]
+    except (FileNotFoundError, ValueError):
+        pass
+
+    board = grading.load_board(path)
+    if board is None:
+        return None
+    board = shrink(board, THUMBNAIL_FIELDS)
+
+    # written at once, other threads (or the game started again) never read a partial file
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        binformat.write(cached, board, atomic=True)
+    except OSError:
+        pass  # the thumbnail is made again next time
+
+    return board
+
+
+def shrink(board: np.ndarray, fields: int) -> np.ndarray:
+    """
+    Shrinks the board to at most `fields` fields on the longer side, a field of the result is full
+    when at least half of the fields it covers are full.
+    """
+    rows, cols = board.shape
+    factor = -(-max(rows, cols) // fields)
+    if factor <= 1:
+        return board
+
+    padded = np.zeros((-(-rows // factor) * factor, -(-cols // factor) * factor), bool)
+    padded[:rows, :cols] = board
+    blocks = padded.reshape((padded.shape[0] // factor, factor, padded.shape[1] // factor, factor))
+    return blocks.mean(axis=(1, 3)) >= 0.5
@@ -0,0 +1,9 @@
+import pytest
+
+import onono.imagecache
+
+
+@pytest.fixture(autouse=True)
+def image_cache(tmp_path, monkeypatch):
+    # converted images are cached in a temporary directory, never in `saves/.imagecache`
+    monkeypatch.setattr(onono.imagecache, "CACHE_DIR", tmp_path / ".imagecache")
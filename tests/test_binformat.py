@@ -0,0 +1,92 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+import onono.binformat
+import onono.savegame
+
+
+@pytest.mark.parametrize('dims', [(1, 1), (10, 10), (7, 13), (64, 3)])
+def test_roundtrip(dims):
+    rng = np.random.default_rng(0)
+    board = rng.random(dims) < 0.5
+    guesses = rng.integers(0, 3, dims).astype(np.int8)
+
+    loaded, no_guesses, no_runs = onono.binformat.loads(onono.binformat.dumps(board))
+    assert np.array_equal(loaded, board) and loaded.dtype == bool and no_guesses is None and no_runs is None
+
+    loaded, loaded_guesses, _ = onono.binformat.loads(onono.binformat.dumps(board, guesses))
+    assert np.array_equal(loaded, board) and np.array_equal(loaded_guesses, guesses)
+
+    runs = {"y": onono.savegame.board_to_hints(board), "x": onono.savegame.board_to_hints(board.T)}
+    loaded, _, loaded_runs = onono.binformat.loads(onono.binformat.dumps(board, guesses, runs))
+    assert np.array_equal(loaded, board)
+    for axis in "xy":
+        assert all(np.array_equal(a, b) for a, b in zip(loaded_runs[axis], runs[axis]))
+
+
+def test_invalid():
+    board = np.eye(10, dtype=bool)
+    data = onono.binformat.dumps(board)
+    runs = {"y": onono.savegame.board_to_hints(board), "x": onono.savegame.board_to_hints(board.T)}
+    with_hints = onono.binformat.dumps(board, runs=runs)
+
+    damaged = bytearray(data)
+    damaged[-1] ^= 1
+    for invalid in [b"", data[:10], b"XXXX" + data[4:], data[:-1], bytes(damaged), data + b"\0\0", with_hints[:-2]]:
+        with pytest.raises(ValueError):
+            onono.binformat.loads(invalid)
+
+
+def test_save_binary():
+    name = "tests/temp_binary"
+    save = onono.savegame.SaveGame()
+    assert save.load_game("tests/valid")
+    save.guesses[0, :3] = [1, 2, 2]
+    save.save_path(onono.savegame.get_saves_dir() / (name + ".nono"), guesses=True)
+
+    loaded = onono.savegame.SaveGame()
+    try:
+        assert name.split("/")[1] in onono.savegame.get_savegames("tests")
+        assert loaded.load_game(name)
+    finally:
+        os.remove(onono.savegame.get_saves_dir() / (name + ".nono"))
+
+    assert np.array_equal(loaded.board, save.board)
+    assert np.array_equal(loaded.guesses, save.guesses)
+    assert loaded.x == save.x and loaded.y == save.y
+
+
+def test_load_speed(tmp_path):
+    save = onono.savegame.SaveGame()
+    save.set_board(np.random.default_rng(0).random((2000, 2000)) < 0.5)
+    save.save_path(tmp_path / "big.nono")
+    assert len(onono.binformat.dumps(save.board)) < 2000 * 2000 // 8 + 100  # hints are stored after the board
+
+    start = time.perf_counter()
+    board, _, _ = onono.binformat.read(tmp_path / "big.nono")
+    assert time.perf_counter() - start < 0.05  # usually few milliseconds
+    assert np.array_equal(board, save.board)
+
+    # stored hints are not calculated again
+    loaded = onono.savegame.SaveGame()
+    start = time.perf_counter()
+    assert loaded.load_path(tmp_path / "big.nono")
+    assert time.perf_counter() - start < 0.2
+    assert loaded.x == save.x and loaded.y == save.y
+
+
+def test_write_atomic(tmp_path, monkeypatch):
+    board = np.eye(5, dtype=bool)
+    onono.binformat.write(tmp_path / "board.nono", board, atomic=True)
+    assert np.array_equal(onono.binformat.read(tmp_path / "board.nono")[0], board)
+
+    def replace(*_):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(onono.binformat.os, "replace", replace)
+    with pytest.raises(OSError):
+        onono.binformat.write(tmp_path / "other.nono", board, atomic=True)
+    assert [path.name for path in tmp_path.iterdir()] == ["board.nono"]  # temporary file is removed
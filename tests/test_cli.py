@@ -0,0 +1,159 @@
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import onono.cli
+import onono.grading
+import onono.generator
+import onono.image
+import onono.pack
+import onono.savegame
+
+
+def run_cli(capsys, args: list) -> list:
+    """
+    Runs the command line tool and returns the printed JSON lines.
+    """
+    assert onono.cli.main(args) == 0
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_solve(capsys, jobs):
+    directory = onono.savegame.get_saves_dir() / "tests"
+    results = run_cli(capsys, ["solve", str(directory), "-j", str(jobs)])
+
+    results = {result["file"].split("/")[-1]: result for result in results}
+    assert len(results) == len(onono.savegame.get_savegames("tests"))
+
+    assert results["valid.csv"]["solvable"] and results["valid.csv"]["unique"]
+    assert results["diagonal.csv"]["solvable"] and results["diagonal.csv"]["unique"] is False
+    for name in ["invalid1.csv", "invalid2.csv", "invalid3.csv"]:
+        assert "error" in results[name]
+
+
+def test_solve_recursive(capsys):
+    results = run_cli(capsys, ["solve", str(onono.savegame.get_saves_dir()), "-r", "-j", "2", "-t", "1"])
+    assert any("/tests/" in result["file"] for result in results)
+    assert all(not result.get("timeout") for result in results)
+
+
+def test_solve_timeout(capsys, tmp_path):
+    save = onono.savegame.SaveGame((60, 60))
+    save.randomize(0.5, rng=np.random.default_rng(0))
+    save.save_path(tmp_path / "hard.nono")
+
+    result = run_cli(capsys, ["solve", str(tmp_path), "-j", "1", "-t", "0"])[0]
+    assert result["timeout"] and result["solvable"] is None and result["unique"] is None
+
+
+@pytest.mark.parametrize('module', [False, True])
+def test_launch(tmp_path, module):
+    onono.savegame.SaveGame((3, 4)).save_path(tmp_path / "empty.csv")
+    package = Path(onono.cli.__file__).parent
+    launch = ["-m", "onono"] if module else [str(package)]
+
+    output = subprocess.run([sys.executable, *launch, "solve", str(tmp_path), "-j", "1"], cwd=package.parent,
+                            capture_output=True, text=True, check=True).stdout
+    assert json.loads(output.splitlines()[-1])["solvable"]
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_generate_command(capsys, tmp_path, jobs):
+    assert onono.cli.main(["generate", str(tmp_path), "-n", "12", "-s", "5", "--size", "6", "9", "-j", str(jobs)]) == 0
+    assert json.loads(capsys.readouterr().out.splitlines()[-1])["generated"] == 12
+
+    files = sorted(tmp_path.glob("*.csv"))
+    assert [path.name for path in files] == [f"puzzle{i:02d}.csv" for i in range(12)]
+
+    save = onono.savegame.SaveGame()
+    for i, path in enumerate(files):
+        assert save.load_path(path)
+        assert np.array_equal(save.board, onono.generator.generate_board(5, i, (6, 9), 0.6))
+
+
+def test_convert(capsys, tmp_path):
+    for name in ["valid", "diagonal", "invalid1"]:
+        (tmp_path / f"{name}.csv").write_bytes((onono.savegame.get_saves_dir() / "tests" / f"{name}.csv").read_bytes())
+
+    results = run_cli(capsys, ["convert", str(tmp_path), "--delete", "-j", "1"])
+    assert sum("error" in result for result in results) == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["diagonal.nono", "invalid1.csv", "valid.nono"]
+
+    results = run_cli(capsys, ["solve", str(tmp_path), "-j", "1"])
+    results = {result["file"].split("/")[-1]: result for result in results}
+    assert results["valid.nono"]["unique"] and results["diagonal.nono"]["unique"] is False
+
+
+def test_generate_pack(capsys, tmp_path):
+    run_cli(capsys, ["generate", str(tmp_path / "season.onpack"), "--pack", "-n", "10", "-s", "5", "-j", "2"])
+
+    save = onono.savegame.SaveGame()
+    with onono.pack.PackReader(tmp_path / "season.onpack") as pack:
+        assert len(pack) == 10
+        for i in range(10):
+            assert save.load_pack(pack, i)
+            assert np.array_equal(save.board, onono.generator.generate_board(5, i, (10, 10), 0.6))
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_images(capsys, tmp_path, jobs):
+    directory = onono.savegame.get_saves_dir() / "images"
+    output = tmp_path / "images.onpack"
+    results = run_cli(capsys, ["images", str(output), str(directory), "-r", "--size", "10", "10", "--size", "12", "20",
+                               "-f", "0.4", "0.7", "-j", str(jobs)])
+
+    summary = results.pop()
+    puzzles = sorted((result for result in results if "index" in result and "error" not in result), key=lambda r: r["index"])
+    assert summary["converted"] == len(puzzles) > 0
+    assert any(result.get("error") == "invalid image" for result in results)
+
+    with onono.pack.PackReader(output) as pack:
+        assert len(pack) == len(puzzles)
+        for i, result in enumerate(puzzles):
+            board = pack.load(i)[0]
+            expected = onono.image.image_boards(result["file"], [(result["rows"], result["cols"])], [result["fill"]])[0]
+            assert board.shape == (result["rows"], result["cols"])
+            assert np.array_equal(board, expected)
+
+
+def test_mosaic(capsys, tmp_path):
+    path = onono.savegame.get_saves_dir() / "images" / "lenny.png"
+    results = run_cli(capsys, ["mosaic", str(path), str(tmp_path / "mosaic.onpack"), "--grid", "3", "2", "--size", "8", "6"])
+    assert [(result["row"], result["col"]) for result in results] == [(0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1)]
+
+    boards = onono.image.mosaic(path, (3, 2), (8, 6))
+    with onono.pack.PackReader(tmp_path / "mosaic.onpack") as pack:
+        assert len(pack) == 6
+        for i, result in enumerate(results):
+            assert np.array_equal(pack.load(i)[0], boards[result["row"], result["col"]])
+        assert pack.grid == (3, 2)
+        assert np.array_equal(pack.picture(), np.block([[boards[row, col] for col in range(2)] for row in range(3)]))
+
+    assert onono.cli.main(["mosaic", str(path.with_name("nothing.png")), str(tmp_path / "none.onpack")]) == 1
+
+
+def test_grade_invalid(capsys, tmp_path, monkeypatch):
+    paths = [tmp_path / "valid.csv", tmp_path / "truncated.png"]
+    shutil.copy(onono.savegame.get_saves_dir() / "tests" / "valid.csv", paths[0])
+    paths[1].write_bytes((onono.savegame.get_saves_dir() / "images" / "lenna.png").read_bytes()[:5000])
+
+    index_class = onono.grading.GradeIndex
+    monkeypatch.setattr(onono.grading, "get_library", lambda: paths)
+    monkeypatch.setattr(onono.grading, "GradeIndex", lambda: index_class(tmp_path))
+
+    results = run_cli(capsys, ["grade", "-j", "1"])
+    assert [result.get("error") for result in results] == [None, "invalid file"]
+    assert index_class(tmp_path).stale(paths) == []
+
+    # grades finished before an error are saved
+    (tmp_path / ".grades.json").unlink()
+    monkeypatch.setattr(onono.cli, "grade_path", lambda path: (path, onono.grading.grade_file(path) or 1 // 0))
+    with pytest.raises(ZeroDivisionError):
+        onono.cli.main(["grade", "-j", "1"])
+    assert index_class(tmp_path).stale(paths) == [paths[1]]
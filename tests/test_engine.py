@@ -0,0 +1,129 @@
+import gc
+import time
+
+import numpy as np
+import pytest
+
+import onono.engine
+import onono.savegame
+
+
+def prepare_engine(dims: tuple = (10, 10)) -> onono.engine.Engine:
+    save = onono.savegame.SaveGame(dims)
+    save.randomize(0.6)
+    return onono.engine.Engine(save)
+
+
+def test_apply_move():
+    engine = prepare_engine((5, 8))
+
+    assert engine.apply_move(7, 4, 1)
+    assert engine.game.guesses[4, 7] == 2
+    assert engine.apply_move(7, 4, 3)
+    assert engine.game.guesses[4, 7] == 1
+
+    # outside of the board, wrong buttons
+    assert not engine.apply_move(8, 4, 1)
+    assert not engine.apply_move(4, 7, 1)
+    assert not engine.apply_move(-1, 0, 1)
+    assert not engine.apply_move(0, 0, 2)
+
+
+@pytest.mark.parametrize('dims, count',
+                         [((10, 10), 1000),
+                          ((3, 4), 500),  # many clicks on every field
+                          ((30, 20), 100)])
+def test_apply_moves(dims, count):
+    """
+    Batch of moves has to end in the same state as the moves applied one by one.
+    """
+    rng = np.random.default_rng(count)
+    moves = np.column_stack([rng.integers(-1, dims[1] + 1, count),
+                             rng.integers(-1, dims[0] + 1, count),
+                             rng.choice([1, 2, 3, 3, 1], count)])
+
+    engine = prepare_engine(dims)
+    reference = onono.engine.Engine(onono.savegame.SaveGame(dims))
+    reference.game.board = engine.game.board
+    reference.game.overwrite_lengths()
+
+    # not starting from an empty board
+    for engine_ in [engine, reference]:
+        engine_.apply_moves(moves[:count // 2])
+
+    applied = sum(reference.apply_move(*move) for move in moves)
+    assert engine.apply_moves(moves) == applied
+    assert np.array_equal(engine.game.guesses, reference.game.guesses)
+
+    state, reference_state = engine.state(), reference.state()
+    assert np.array_equal(state["rows"], reference_state["rows"])
+    assert np.array_equal(state["cols"], reference_state["cols"])
+
+
+def test_state():
+    engine = prepare_engine()
+    assert not engine.state()["won"]
+
+    engine.solve()
+    state = engine.state()
+    assert state["won"] and state["rows"].all() and state["cols"].all()
+
+    # copy of the guesses
+    state["guesses"][:] = 0
+    assert engine.is_won()
+
+
+def test_apply_moves_speed():
+    engine = prepare_engine((50, 50))
+    rng = np.random.default_rng(0)
+    moves = np.column_stack([rng.integers(0, 50, 1_000_000),
+                             rng.integers(0, 50, 1_000_000),
+                             rng.choice([1, 3], 1_000_000)])
+
+    start = time.perf_counter()
+    assert engine.apply_moves(moves) == 1_000_000
+    assert time.perf_counter() - start < 2  # roughly a million moves per second even on slow machines
+
+
+@pytest.mark.parametrize('dims, limit',
+                         [((10, 10), 0.033),
+                          ((50, 50), 0.1)])
+def test_hint(dims, limit):
+    """
+    Following the hints solves a unique puzzle, every hint has to agree with the board.
+    """
+    save = onono.savegame.SaveGame(dims)
+    np.random.seed(0)
+    save.randomize(0.7, unique=True)
+    engine = onono.engine.Engine(save)
+    gc.collect()  # measuring the hints, not the garbage of previous tests
+
+    for _ in range(dims[0] * dims[1]):
+        start = time.perf_counter()
+        hint = engine.hint()
+        assert time.perf_counter() - start < limit
+
+        if hint is None:
+            break
+        assert not hint["conflict"] and hint["reason"]
+        assert hint["value"] == save.board[hint["row"], hint["col"]]
+
+        engine.apply_move(hint["col"], hint["row"], 1 if hint["value"] else 3)
+
+    assert engine.is_won()
+
+
+def test_hint_conflict():
+    save = onono.savegame.SaveGame()
+    board = np.eye(10, dtype=bool)
+    board[2, 4:7] = True  # row 3 has hints [1, 3]
+    save.set_board(board)
+    engine = onono.engine.Engine(save)
+    engine.solve()
+    engine.game.guesses[2] = 1  # whole row crossed out
+    engine.game.guesses[2, 0] = 2
+    engine.game.mark_dirty()
+
+    hint = engine.hint()
+    assert hint["conflict"] and hint["axis"] == 0 and hint["index"] == 2
+    assert "Row 3" in hint["reason"]
@@ -1,4 +1,7 @@
+import tracemalloc
+
 import numpy as np
+import pytest
 
 import onono.savegame
 import onono.gamelogic
@@ -72,6 +75,160 @@ def test_validate_diagonal():
         save.guesses = np.roll(save.guesses, 1, axis=1)
 
 
+def test_validate_incremental():
+    """
+    Random clicks, incremental validation has to give the same results as the full one.
+    """
+    save = onono.savegame.SaveGame((15, 10))
+    save.randomize(0.6)
+    reference = onono.savegame.SaveGame((15, 10))
+    reference.board = save.board
+    reference.overwrite_lengths()
+
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        pos = np.array((rng.integers(10), rng.integers(15)))
+        button = rng.choice([1, 3])
+        onono.gamelogic.change_field(save, pos, button)
+        onono.gamelogic.change_field(reference, pos, button)
+
+        assert onono.gamelogic.validate_game(save, incremental=True) == onono.gamelogic.validate_game(reference)
+        assert save.x == reference.x and save.y == reference.y
+
+    assert not save.validation["rows"] and not save.validation["cols"]
+
+    save.get_solution(True)  # marks the whole board
+    assert onono.gamelogic.validate_game(save, incremental=True)
+    assert save.validation["completed"] == 25
+
+
+@pytest.mark.parametrize('name', ["tests/diagonal", "tests/valid"])
+def test_validate_bitboard(name):
+    """
+    Bitboard backend has to give the same results (including the row/column completeness) as the default one.
+    """
+    save = onono.savegame.SaveGame(use_bitboard=True)
+    reference = onono.savegame.SaveGame()
+    assert save.load_game(name) and reference.load_game(name)
+    assert save.bitboard.rows.dtype == np.uint64
+
+    for game in [save, reference]:
+        game.get_solution(True)
+        game.guesses = np.roll(game.guesses, 1, axis=0)
+        game.mark_dirty()
+
+    rng = np.random.default_rng(1)
+    for i in range(200):
+        pos = np.array((rng.integers(10), rng.integers(10)))
+        button = rng.choice([1, 3])
+        onono.gamelogic.change_field(save, pos, button)
+        onono.gamelogic.change_field(reference, pos, button)
+
+        incremental = i % 2 == 0
+        assert onono.gamelogic.validate_game(save, incremental) == onono.gamelogic.validate_game(reference, incremental)
+        assert save.x == reference.x and save.y == reference.y
+
+    save.get_solution(True)
+    assert onono.gamelogic.validate_game(save)
+    assert onono.gamelogic.validate_game(save, incremental=True)
+
+
+def test_validate_batch():
+    """
+    Batch validation has to match `validate_game` for every game in the stack.
+    """
+    dims = (8, 12)
+    rng = np.random.default_rng(2)
+    games = []
+    for i in range(20):
+        save = onono.savegame.SaveGame(dims)
+        save.randomize(0.6)
+        save.get_solution(True)
+        if i % 3 != 0:
+            # some random wrong guesses
+            for _ in range(i):
+                onono.gamelogic.change_field(save, np.array((rng.integers(12), rng.integers(8))), rng.choice([1, 3]))
+        games.append(save)
+
+    boards = np.stack([save.board for save in games])
+    guesses = np.stack([save.guesses for save in games])
+    won, rows_complete, cols_complete = onono.gamelogic.validate_batch(boards, guesses)
+
+    assert won.shape == (20,) and rows_complete.shape == (20, 8) and cols_complete.shape == (20, 12)
+    for i, save in enumerate(games):
+        assert won[i] == onono.gamelogic.validate_game(save)
+        if not won[i]:
+            assert rows_complete[i].tolist() == [complete for _, complete in save.y]
+            assert cols_complete[i].tolist() == [complete for _, complete in save.x]
+
+
+def test_conflicts():
+    save = onono.savegame.SaveGame()
+    assert save.load_game("tests/valid")
+    rows, cols = save.conflicts
+
+    # row 4 is full and column 3 has hints 3 6... one X makes both impossible
+    onono.gamelogic.change_field(save, np.array((3, 4)), 3)
+    assert rows.tolist() == [i == 4 for i in range(10)]
+    assert cols.tolist() == [i == 3 for i in range(10)]
+
+    onono.gamelogic.change_field(save, np.array((3, 4)), 3)
+    assert not rows.any() and not cols.any()
+
+    # filling the whole column 0 (hints 1 1 1 1 1... not possible)
+    for i in range(10):
+        onono.gamelogic.change_field(save, np.array((0, i)), 1)
+    assert cols[0] and cols.sum() == 1
+
+    save.get_solution(True)
+    assert not rows.any() and not cols.any()
+
+
+def test_validate_allocations():
+    """
+    Measures memory allocated by one frame of validation. After the first call, buffers are reused
+    and no temporary arrays of board size are created.
+    """
+    dims = (1000, 1000)
+    save = onono.savegame.SaveGame(dims)
+    save.randomize(0.5)
+    save.get_solution(True)
+
+    assert save.guesses.nbytes == dims[0] * dims[1]  # one byte per field
+
+    assert onono.gamelogic.validate_game(save)  # allocates the buffers
+    assert onono.gamelogic.validate_game(save, incremental=True)
+
+    tracemalloc.start()
+    for _ in range(10):
+        assert onono.gamelogic.validate_game(save)
+        assert onono.gamelogic.validate_game(save, incremental=True)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert peak < 10_000  # full board would be 1 MB
+
+    # unsolved board (one wrong guess)... lines are checked one by one, as in a real frame
+    save.guesses[500, 500] = 3 - save.guesses[500, 500]
+    save.mark_dirty(500, 500)
+    assert not onono.gamelogic.validate_game(save)
+    assert not onono.gamelogic.validate_game(save, incremental=True)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(10):
+        assert not onono.gamelogic.validate_game(save)
+        save.mark_dirty(500, 500)
+        assert not onono.gamelogic.validate_game(save, incremental=True)
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    # blocks still allocated after the frames (including the snapshots of tracemalloc)... nothing accumulates
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "lineno"))
+    assert peak < 50_000 and blocks < 50
+
+
 def validate_asserts(save: onono.savegame.SaveGame, valid: bool):
     """
     Used as a part of validation tests. Checks both functions `validate_game` and `validate_row`.
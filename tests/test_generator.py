@@ -0,0 +1,25 @@
+import numpy as np
+
+import onono.generator
+import onono.savegame
+
+
+def test_generate_board():
+    for index in range(20):
+        board = onono.generator.generate_board(1, index, (5, 12), 0.6)
+        assert 5 <= board.shape[0] <= 12 and 5 <= board.shape[1] <= 12
+
+        save = onono.savegame.SaveGame()
+        save.set_board(board)
+        result = save.solve(max_solutions=2)
+        assert result["unique"]
+        assert np.array_equal(result["solutions"][0], board)
+
+
+def test_generate_reproducible():
+    first = [onono.generator.generate_board(7, index, (8, 10), 0.5) for index in range(10)]
+    second = [onono.generator.generate_board(7, index, (8, 10), 0.5) for index in range(10)]
+    other = [onono.generator.generate_board(8, index, (8, 10), 0.5) for index in range(10)]
+
+    assert all(np.array_equal(a, b) for a, b in zip(first, second))
+    assert not all(a.shape == b.shape and np.array_equal(a, b) for a, b in zip(first, other))
@@ -0,0 +1,63 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+import onono.grading
+import onono.savegame
+
+
+@pytest.mark.parametrize('name, difficulty',
+                         [("tests/valid", "easy"),
+                          ("tests/diagonal", "ambiguous")])
+def test_grade_board(name, difficulty):
+    save = onono.savegame.SaveGame()
+    assert save.load_game(name)
+
+    grade = onono.grading.grade_board(save.board)
+    assert grade["difficulty"] == difficulty
+    assert grade["rows"] == grade["cols"] == 10
+    assert 0 < grade["density"] < 1 and grade["score"] > 0
+
+
+def test_grade_file():
+    directory = onono.savegame.get_saves_dir()
+    assert onono.grading.grade_file(directory / "tests" / "valid.csv")["unique"]
+    assert onono.grading.grade_file(directory / "images" / "lenna.png")["rows"] == 10
+    assert onono.grading.grade_file(directory / "tests" / "invalid1.csv") is None
+    assert onono.grading.grade_file(directory / "images" / "tests" / "invalid1.png") is None
+
+
+def test_load_board_truncated(tmp_path):
+    (tmp_path / "truncated.png").write_bytes((onono.savegame.get_saves_dir() / "images" / "lenna.png").read_bytes()[:5000])
+    assert onono.grading.load_board(tmp_path / "truncated.png") is None
+
+
+def test_grade_index(tmp_path):
+    source = onono.savegame.get_saves_dir()
+    for name in ["Game01.csv", "Game02.csv"]:
+        shutil.copy(source / name, tmp_path / name)
+    paths = sorted(tmp_path.glob("*.csv"))
+
+    index = onono.grading.GradeIndex(tmp_path)
+    assert index.stale(paths) == paths
+    for path in paths:
+        index.set(path, onono.grading.grade_file(path))
+    index.save()
+
+    # new index reads the cached values
+    index = onono.grading.GradeIndex(tmp_path)
+    assert index.stale(paths) == []
+    assert index.get(paths[0])["rows"] == 10
+
+    # only modification time changed... not graded again
+    os.utime(paths[0], (1, 1))
+    assert index.get(paths[0]) is None
+    assert index.stale(paths) == []
+    assert index.get(paths[0]) is not None
+
+    # content changed
+    np.savetxt(paths[1], np.ones((5, 5)), fmt='%.0d', delimiter=',')
+    os.utime(paths[1], (2, 2))
+    assert index.stale(paths) == [paths[1]]
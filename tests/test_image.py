@@ -2,6 +2,7 @@ from pathlib import Path
 
 import numpy as np
 import pytest
+from PIL import Image
 
 import onono.image
 
@@ -60,5 +61,111 @@ def test_apply_threshold(name: str):
         prev_threshold, prev_ratio = threshold, ratio
 
 
+def threshold_stepwise(image: np.ndarray, expected_filled: float) -> tuple:
+    """
+    Helper function for test_apply_threshold_same. Original step by step search of the threshold.
+    """
+    total_px = image.shape[0] * image.shape[1]
+    prev_threshold = 128
+    threshold = 128
+    closest_match = 1.
+    while True:
+        mask = image > threshold
+        filled = mask.sum() / total_px
+        difference = filled - expected_filled
+
+        if threshold == 128 or abs(difference) <= closest_match:
+            closest_match = abs(difference)
+        else:
+            break
+
+        next_threshold = threshold - 1 if difference < 0 else threshold + 1
+        if next_threshold == prev_threshold or next_threshold < 0 or next_threshold > 255:
+            break
+        prev_threshold = threshold
+        threshold = next_threshold
+
+    return mask, prev_threshold
+
+
+@pytest.mark.parametrize('seed, shape, low, high',
+                         [(0, (10, 10), 0, 256),
+                          (1, (25, 40), 100, 160),
+                          (2, (30, 30), 0, 2),
+                          (3, (15, 20), 250, 256),
+                          (4, (1, 1), 0, 256)])
+def test_apply_threshold_same(seed, shape, low, high):
+    rng = np.random.default_rng(seed)
+    images = [rng.integers(low, high, shape, dtype=np.uint8), np.full(shape, low, np.uint8)]
+    images.append(rng.uniform(low - 10, high + 10, shape))  # not uint8, out of the range
+
+    for img in images:
+        for expected_ratio in np.concatenate((np.arange(0, 1.05, 0.05), rng.random(10))):
+            mask, threshold = onono.image.apply_threshold(img, expected_ratio, True)
+            expected_mask, expected_threshold = threshold_stepwise(img, expected_ratio)
+
+            assert threshold == expected_threshold
+            assert np.array_equal(mask, expected_mask)
+
+
+def test_apply_threshold_stack():
+    rng = np.random.default_rng(5)
+    stack = rng.integers(0, 256, (6, 12, 8), dtype=np.uint8)
+    ratios = rng.random(6)
+
+    masks, thresholds = onono.image.apply_threshold(stack, ratios, True)
+    assert masks.shape == stack.shape and thresholds.shape == (6,)
+    for img, ratio, mask, threshold in zip(stack, ratios, masks, thresholds):
+        assert np.array_equal(mask, onono.image.apply_threshold(img, ratio))
+        assert threshold == threshold_stepwise(img, ratio)[1]
+
+    assert np.array_equal(onono.image.apply_threshold(stack, 0.3)[2], onono.image.apply_threshold(stack[2], 0.3))
+
+
+def test_image_prepare_big(tmp_path):
+    rng = np.random.default_rng(0)
+    Image.fromarray((rng.random((3000, 4000, 3)) * 255).astype(np.uint8)).save(tmp_path / "big.jpg")
+    Image.fromarray((rng.random((1000, 1200)) * 4).astype(np.uint8), "P").save(tmp_path / "big.png")
+
+    # decoded in 1/8 of the resolution, less than the limit
+    with onono.image.open_image(tmp_path / "big.jpg", [(10, 10)]) as image:
+        assert image.size == (500, 375) and image.mode == "L"
+    assert onono.image.image_prepare(tmp_path / "big.jpg", (10, 10), memory_limit=10 ** 6).shape == (10, 10)
+    assert onono.image.image_prepare(tmp_path / "big.png", (20, 15)).shape == (15, 20)
+
+    for path in [tmp_path / "big.jpg", tmp_path / "big.png"]:
+        with pytest.raises(ValueError):
+            onono.image.image_prepare(path, (500, 500), memory_limit=10 ** 6)
+
+
 def test_get_images():
     assert len(onono.image.get_images()) >= 3  # 3 currently used, more can be added later
+
+
+def test_image_boards():
+    path = Path(__file__).parent.parent / 'saves' / 'images' / 'lenna.png'
+    boards = onono.image.image_boards(path, [(10, 10), (8, 15), (600, 600)], [0.3, 0.7])
+
+    assert len(boards) == 6 and boards[4] is None and boards[5] is None
+    assert boards[2].shape == (8, 15)
+    for board, (dims, ratio) in zip(boards, [((10, 10), 0.3), ((10, 10), 0.7), ((15, 8), 0.3), ((15, 8), 0.7)]):
+        assert np.array_equal(board, onono.image.apply_threshold(onono.image.image_prepare(path, dims), ratio))
+
+
+def test_mosaic():
+    path = Path(__file__).parent.parent / 'saves' / 'images' / 'lenna.png'
+    boards = onono.image.mosaic(path, (2, 3), (10, 12), 0.5)
+    assert boards.shape == (2, 3, 10, 12) and boards.dtype == bool
+
+    # tiles together are the whole picture thresholded at once
+    picture = np.block([[boards[row, col] for col in range(3)] for row in range(2)])
+    assert abs(get_ratio(picture) - 0.5) < 0.05
+    assert not np.array_equal(boards[0, 0], boards[0, 1])
+
+    local = onono.image.mosaic(path, (2, 3), (10, 12), 0.5, local=True)
+    for row in range(2):
+        for col in range(3):
+            assert abs(get_ratio(local[row, col]) - 0.5) < 0.1
+
+    with pytest.raises(AssertionError):
+        onono.image.mosaic(path, (20, 30), (80, 90))
@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+
+import onono.image
+import onono.imagecache
+
+
+def test_cache_key():
+    key = onono.imagecache.cache_key(b"image", (10, 10), 0.7)
+    assert key == onono.imagecache.cache_key(b"image", (np.int64(10), 10), 0.7)
+    for other in [(b"image2", (10, 10), 0.7), (b"image", (10, 12), 0.7), (b"image", (10, 10), 0.5)]:
+        assert onono.imagecache.cache_key(*other) != key
+
+
+def test_get_put(tmp_path):
+    board = np.random.default_rng(0).random((12, 7)) < 0.5
+    assert onono.imagecache.get("abc", tmp_path) is None
+
+    onono.imagecache.put("abc", board, tmp_path)
+    assert np.array_equal(onono.imagecache.get("abc", tmp_path), board)
+    assert [path.name for path in tmp_path.iterdir()] == ["abc.nono"]
+
+    (tmp_path / "abc.nono").write_bytes(b"damaged")
+    assert onono.imagecache.get("abc", tmp_path) is None
+
+
+def test_evict(tmp_path, monkeypatch):
+    monkeypatch.setattr(onono.imagecache, "EVICT_INTERVAL", 1)
+    board = np.ones((10, 10), bool)
+    for i in range(10):
+        onono.imagecache.put(f"key{i}", board, tmp_path)
+        os.utime(tmp_path / f"key{i}.nono", ns=(i * 10 ** 9, i * 10 ** 9))
+
+    # tiny files are counted as whole blocks
+    onono.imagecache.get("key0", tmp_path)  # recently used
+    onono.imagecache.put("key10", board, tmp_path, limit=onono.imagecache.BLOCK_SIZE * 10)
+
+    names = sorted(path.stem for path in tmp_path.iterdir())
+    assert len(names) == 8
+    assert "key0" in names and "key10" in names and "key1" not in names and "key2" not in names
+
+
+def test_evict_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(onono.imagecache, "EVICT_INTERVAL", 4)
+    monkeypatch.setattr(onono.imagecache, "_stored", {"count": 0})
+    scans = []
+    monkeypatch.setattr(onono.imagecache, "evict", lambda directory, limit: scans.append(directory))
+
+    for i in range(10):
+        onono.imagecache.put(f"key{i}", np.ones((3, 3), bool), tmp_path)
+    assert len(scans) == 3
+
+
+def test_load_image_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(onono.imagecache, "CACHE_DIR", tmp_path)
+    board = onono.image.load_image("lenny", (12, 15), 0.4)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # second time without opening the image
+    monkeypatch.setattr(onono.image, "image_prepare", None)
+    assert np.array_equal(onono.image.load_image("lenny", (12, 15), 0.4), board)
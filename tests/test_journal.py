@@ -0,0 +1,99 @@
+import time
+
+import numpy as np
+
+import onono.binformat
+import onono.engine
+import onono.journal
+import onono.savegame
+
+
+def play(path, moves: np.ndarray, guesses: bool = False):
+    """
+    Plays the moves on the test game with a journal, returns the game.
+    """
+    game = onono.savegame.SaveGame()
+    assert game.load_game("tests/valid")
+    if guesses:
+        game.guesses[0, 0] = 1
+
+    engine = onono.engine.Engine(game)
+    journal = onono.journal.Journal(path, game, 5.)
+    for i, (x, y, button) in enumerate(moves.tolist()):
+        if engine.apply_move(x, y, button):
+            journal.record(x, y, button, 5. + i)
+    journal.close()
+    return game
+
+
+def random_moves(count: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.column_stack((rng.integers(0, 10, (count, 2)), rng.choice([1, 3], count)))
+
+
+def test_resume(tmp_path):
+    game = play(tmp_path / "session", random_moves(300), guesses=True)
+
+    resumed, elapsed = onono.journal.load(tmp_path / "session")
+    assert np.array_equal(resumed.board, game.board)
+    assert np.array_equal(resumed.guesses, game.guesses)
+    assert elapsed == 5. + 299
+    assert all(np.array_equal(a, b) for a, b in zip(resumed.conflicts, game.conflicts))
+
+
+def test_resume_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(onono.journal, "SNAPSHOT_INTERVAL", 50)
+    game = play(tmp_path / "session", random_moves(120, seed=1))
+
+    header = onono.journal.HEADER.size + len(onono.binformat.dumps(game.board, game.guesses))
+    assert (tmp_path / "session").stat().st_size == header + 20 * onono.journal.MOVE.itemsize
+    assert np.array_equal(onono.journal.load(tmp_path / "session")[0].guesses, game.guesses)
+    assert list(tmp_path.iterdir()) == [tmp_path / "session"]
+
+
+def test_resume_elapsed(tmp_path):
+    game = onono.savegame.SaveGame()
+    game.set_board(np.eye(5, dtype=bool))
+    journal = onono.journal.Journal(tmp_path / "session", game, elapsed=3.)
+    journal.record(1, 1, 1, 7.)
+    journal.snapshot(42.)  # window closed later than the last move
+    journal.close()
+    assert onono.journal.load(tmp_path / "session")[1] == 42.
+
+    # no moves at all
+    journal = onono.journal.Journal(tmp_path / "session", game, elapsed=3.)
+    journal.snapshot(10.)
+    journal.close()
+    assert onono.journal.load(tmp_path / "session")[1] == 10.
+
+def test_resume_damaged(tmp_path):
+    game = play(tmp_path / "session", random_moves(30))
+    with open(tmp_path / "session", "ab") as file:
+        file.write(b"\x00\x01")  # move written only partially
+
+    assert np.array_equal(onono.journal.load(tmp_path / "session")[0].guesses, game.guesses)
+
+    (tmp_path / "session").write_bytes(b"ONOJ")
+    assert onono.journal.load(tmp_path / "session") is None
+    assert onono.journal.load(tmp_path / "missing") is None
+
+
+def test_delete(tmp_path):
+    game = onono.savegame.SaveGame()
+    journal = onono.journal.Journal(tmp_path / "session", game)
+    journal.record(1, 1, 1, 1.)
+    journal.close(delete=True)
+    assert not list(tmp_path.iterdir())
+
+
+def test_record_speed(tmp_path):
+    game = onono.savegame.SaveGame((100, 100))
+    journal = onono.journal.Journal(tmp_path / "session", game)
+
+    start = time.perf_counter()
+    for i in range(1000):
+        journal.record(i % 100, i // 100, 1, float(i))
+    assert time.perf_counter() - start < 0.1  # no waiting for the disk
+    journal.close()
+
+    assert len(onono.journal.load(tmp_path / "session")[0].guesses.nonzero()[0]) == 1000
@@ -0,0 +1,54 @@
+import os
+
+import onono.image
+import onono.library
+import onono.savegame
+
+
+def make_files(directory, names: list):
+    for name in names:
+        (directory / name).write_text("1,0\n")
+    os.utime(directory, ns=(0, 10 ** 9))  # old directory, the listing can be cached
+
+
+def test_listing(tmp_path):
+    make_files(tmp_path, ["b.csv", "a.csv", "a.nono", "c.png", ".hidden.csv", "d.csv.txt"])
+    assert onono.library.listing(tmp_path, (".csv", ".nono")) == ("a", "b")
+    assert onono.library.listing(tmp_path, (".png",)) == ("c",)
+    assert onono.library.listing(tmp_path / "missing", (".png",)) == ()
+
+
+def test_listing_cached(tmp_path, monkeypatch):
+    make_files(tmp_path, ["a.csv"])
+    assert onono.library.listing(tmp_path, (".csv",)) == ("a",)
+
+    scans = []
+    scan = onono.library.DirectoryIndex.scan
+    monkeypatch.setattr(onono.library.DirectoryIndex, "scan", lambda self: scans.append(1) or scan(self))
+
+    for _ in range(100):
+        assert onono.library.listing(tmp_path, (".csv",)) == ("a",)
+    assert not scans
+
+    (tmp_path / "b.csv").write_text("1\n")  # changes the modification time of the directory
+    assert onono.library.listing(tmp_path, (".csv",)) == ("a", "b")
+    assert len(scans) == 1
+
+    (tmp_path / "a.csv").unlink()
+    assert onono.library.listing(tmp_path, (".csv",)) == ("b",)
+
+
+def test_invalidate(tmp_path):
+    make_files(tmp_path, ["a.csv"])
+    assert onono.library.listing(tmp_path, (".csv",)) == ("a",)
+
+    make_files(tmp_path, ["b.csv"])  # same modification time as before
+    assert onono.library.listing(tmp_path, (".csv",)) == ("a",)
+    onono.library.invalidate(tmp_path)
+    assert onono.library.listing(tmp_path, (".csv",)) == ("a", "b")
+
+
+def test_game_listings():
+    assert list(onono.savegame.get_savegames("tests")) == sorted(onono.savegame.get_savegames("tests"))
+    assert "valid" in onono.savegame.get_savegames("tests")
+    assert "lenna" in onono.image.get_images()
@@ -9,10 +9,23 @@ import onono
 
 @pytest.fixture(params=[
     onono.app,
+    onono.binformat,
+    onono.bitboard,
+    onono.cli,
+    onono.engine,
     onono.gamelogic,
+    onono.generator,
+    onono.grading,
     onono.menu,
+    onono.pack,
+    onono.prefetch,
     onono.image,
-    onono.savegame
+    onono.imagecache,
+    onono.journal,
+    onono.library,
+    onono.savegame,
+    onono.solver,
+    onono.thumbnails
 ])
 def linter(request):
     """Test codestyle for various src files."""
@@ -0,0 +1,109 @@
+import time
+
+import pygame as pg
+import pytest
+
+import onono.menu
+import onono.savegame
+import onono.thumbnails
+from onono.gui_definitions import FONT_PATH, MENU_INITIAL_COORDS, MENU_ITEM, MENU_ROWS, PREVIEW_SIZE, SCREEN_SIZE
+
+
+@pytest.fixture
+def data(monkeypatch, tmp_path):
+    """
+    Menu state with a long list of saves, drawn on a surface without any window.
+    """
+    pg.font.init()
+    items = tuple(f"Game{i:05d}" for i in range(5000))
+    monkeypatch.setattr(onono.savegame, "get_savegames", lambda: items)
+
+    return {
+        "buttons": ["Play Now", "Load Game", "Load from Image", "Info", "Quit Game"],
+        "button_clicked": None,
+        "button_hover": None,
+        "menu": "load_save",
+        "resume": False,
+        "labels": {},
+        "scroll": 0,
+        "filter": "",
+        "filtered": None,
+        "font": pg.font.Font(FONT_PATH, 25),
+        "texts": {},
+        "thumbnails": onono.thumbnails.Thumbnails(tmp_path),
+        "previews": {},
+        "screen": pg.Surface(SCREEN_SIZE)
+    }
+
+
+def key(data: dict, code: int, char: str = ""):
+    onono.menu.register_key(data, pg.event.Event(pg.KEYDOWN, key=code, unicode=char))
+
+
+def test_keyboard(data):
+    key(data, pg.K_DOWN)
+    assert data["button_hover"] == 0 and data["scroll"] == 0
+
+    for _ in range(MENU_ROWS):
+        key(data, pg.K_DOWN)
+    assert data["button_hover"] == MENU_ROWS and data["scroll"] == 1
+
+    key(data, pg.K_PAGEDOWN)
+    key(data, pg.K_UP)
+    assert data["button_hover"] == 2 * MENU_ROWS - 1 and data["scroll"] == MENU_ROWS + 1
+
+    key(data, pg.K_RETURN)
+    assert data["button_clicked"] == 2 * MENU_ROWS - 1
+
+
+def test_mouse(data):
+    onono.menu.scroll(data, 100)
+    pos = (MENU_INITIAL_COORDS[0] + 10, MENU_INITIAL_COORDS[1] + 2.5 * MENU_ITEM[1])
+    onono.menu.register_mouse(data, pg.event.Event(pg.MOUSEBUTTONDOWN, pos=pos, button=1), True)
+    assert data["button_clicked"] == 102
+
+    onono.menu.scroll(data, 10 ** 6)
+    assert data["scroll"] == 5000 - MENU_ROWS
+
+
+def test_filter(data):
+    for char in "game0012":
+        key(data, 0, char)
+    assert onono.menu.get_menu_items(data) == tuple(f"Game0012{i}" for i in range(10))
+    assert onono.menu.get_subtitle(data) == "Find: game0012"
+
+    items = onono.menu.get_menu_items(data)
+    assert onono.menu.get_menu_items(data) is items  # filtered only once
+
+    key(data, pg.K_BACKSPACE)
+    assert len(onono.menu.get_menu_items(data)) == 100
+    key(data, pg.K_ESCAPE)
+    assert data["filter"] == "" and data["menu"] == "load_save"
+    key(data, pg.K_ESCAPE)
+    assert data["menu"] == "default"
+
+
+def test_draw_speed(data):
+    items = onono.menu.get_menu_items(data)
+    onono.menu.draw_menu_items(items, data)
+    assert len(data["texts"]) == MENU_ROWS + 1  # visible items and the position in the list
+    assert len(data["thumbnails"].pending) == MENU_ROWS
+
+    start = time.perf_counter()
+    for _ in range(100):
+        onono.menu.draw_menu_items(onono.menu.get_menu_items(data), data)
+    assert time.perf_counter() - start < 0.5  # usually few milliseconds
+
+
+def test_draw_previews(data, monkeypatch):
+    items = ("valid", "diagonal")
+    monkeypatch.setattr(onono.savegame, "get_savegames", lambda: items)
+    monkeypatch.setattr(onono.thumbnails, "find_file", lambda kind, name: onono.savegame.get_saves_dir() / "tests" / f"{name}.csv")
+
+    for _ in range(100):
+        onono.menu.draw_menu_items(items, data)
+        if len(data["previews"]) == 2:
+            break
+        time.sleep(0.01)
+
+    assert data["previews"][("save", "valid")].get_size() == (PREVIEW_SIZE, PREVIEW_SIZE)
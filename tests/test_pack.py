@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+import onono.pack
+import onono.savegame
+
+
+def random_boards(count: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    return [rng.random(tuple(rng.integers(1, 30, 2))) < rng.random() for _ in range(count)]
+
+
+def test_pack(tmp_path):
+    boards = random_boards(200)
+    with onono.pack.PackWriter(tmp_path / "test.onpack") as writer:
+        for board in boards:
+            writer.add(board)
+
+    loaded, reference = onono.savegame.SaveGame(), onono.savegame.SaveGame()
+    with onono.pack.PackReader(tmp_path / "test.onpack") as pack:
+        assert len(pack) == len(boards)
+        for i in [0, 199, 57, 3]:
+            assert loaded.load_pack(pack, i)
+            reference.set_board(boards[i])
+
+            assert np.array_equal(loaded.board, boards[i])
+            assert loaded.x == reference.x and loaded.y == reference.y
+            for key in ["x", "y"]:
+                assert all(np.array_equal(a, b) for a, b in zip(loaded.runs[key], reference.runs[key]))
+
+        assert not loaded.load_pack(pack, 200)
+
+
+def test_pack_keys(tmp_path):
+    boards = random_boards(5, seed=1)
+    with onono.pack.PackWriter(tmp_path / "test.onpack") as writer:
+        for key in [3, 0, 4, 1, 2]:
+            writer.add(boards[key], key=key)
+
+    with onono.pack.PackReader(tmp_path / "test.onpack") as pack:
+        assert all(np.array_equal(pack.load(i)[0], boards[i]) for i in range(5))
+
+
+def test_pack_invalid(tmp_path):
+    for data in [b"", b"ONOP", b"XXXX" + bytes(20), onono.pack.MAGIC + bytes(20)[:4] + b"\xff" * 16]:
+        (tmp_path / "invalid.onpack").write_bytes(data)
+        with pytest.raises(ValueError):
+            onono.pack.PackReader(tmp_path / "invalid.onpack")
+
+
+def test_pack_mosaic(tmp_path):
+    picture = np.random.default_rng(2).random((20, 36)) < 0.5
+    with onono.pack.PackWriter(tmp_path / "mosaic.onpack", grid=(2, 3)) as writer:
+        for row in range(2):
+            for col in range(3):
+                writer.add(picture[row * 10:(row + 1) * 10, col * 12:(col + 1) * 12])
+
+    with onono.pack.PackReader(tmp_path / "mosaic.onpack") as pack:
+        assert pack.grid == (2, 3) and len(pack) == 6
+        assert np.array_equal(pack.picture(), picture)
+
+    with onono.pack.PackWriter(tmp_path / "test.onpack") as writer:
+        writer.add(picture)
+    with onono.pack.PackReader(tmp_path / "test.onpack") as pack:
+        assert pack.grid is None
+        with pytest.raises(ValueError):
+            pack.picture()
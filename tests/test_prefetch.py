@@ -0,0 +1,53 @@
+import itertools
+import threading
+import time
+
+import onono.app
+import onono.prefetch
+import onono.savegame
+
+
+def test_prefetch_bounded():
+    counter = itertools.count()
+    made = []
+    lock = threading.Lock()
+
+    def factory():
+        with lock:
+            made.append(next(counter))
+            return made[-1]
+
+    prefetcher = onono.prefetch.Prefetcher(factory, size=2)
+    time.sleep(0.3)
+    # two games in the queue, one more waiting for a free place
+    assert len(made) <= 3
+
+    assert [prefetcher.get() for _ in range(2)] == [0, 1]
+    prefetcher.stop()
+    assert not prefetcher.thread.is_alive()
+
+
+def test_prefetch_empty():
+    event = threading.Event()
+
+    def factory():
+        event.wait()
+        return "game"
+
+    prefetcher = onono.prefetch.Prefetcher(factory)
+    event.set()  # the game is made in the current thread when nothing is prepared yet
+    assert prefetcher.get() == "game"
+    prefetcher.stop()
+
+
+def test_prefetch_games():
+    prefetcher = onono.prefetch.Prefetcher(onono.app.prepare_game)
+    time.sleep(0.2)
+
+    start = time.perf_counter()
+    game = prefetcher.get()
+    assert time.perf_counter() - start < 0.01
+    prefetcher.stop()
+
+    assert isinstance(game, onono.savegame.SaveGame)
+    assert game.solve(max_solutions=2)["unique"]
@@ -1,5 +1,8 @@
 import filecmp
+import itertools
 import os
+
+import numpy as np
 import pytest
 
 import onono.savegame
@@ -51,6 +54,29 @@ def test_randomize(prob, ratio_min, ratio_max):
     assert ratio_min <= ratio <= ratio_max
 
 
+@pytest.mark.parametrize('dims, prob',
+                         [((10, 10), 0.5),
+                          ((15, 10), 0.3),
+                          ((20, 20), 0.6)])
+def test_randomize_unique(dims, prob):
+    save = onono.savegame.SaveGame(dims)
+    save.randomize(prob, unique=True)
+
+    result = save.solve(max_solutions=2)
+    assert result["unique"]
+    assert np.array_equal(result["solutions"][0], save.board)
+
+
+def test_make_unique():
+    save = onono.savegame.SaveGame()
+    assert save.load_game("tests/diagonal")
+    assert not save.solve(max_solutions=2)["unique"]
+
+    assert save.make_unique()
+    assert save.solve(max_solutions=2)["unique"]
+    assert len(save.x) == len(save.y) == 10
+
+
 def test_get_savegames():
     assert len(onono.savegame.get_savegames("tests")) >= 4  # 4 currently used, more can be added later
 
@@ -72,3 +98,42 @@ def test_image_to_savegame(name, dims, valid):
         assert save.board.ndim == 2
         x, y = save.board.shape
         assert x == len(save.x) and y == len(save.y)
+
+
+@pytest.mark.parametrize('dims, prob',
+                         [((1, 1), 0.5),
+                          ((10, 10), 0.5),
+                          ((30, 7), 0.2),
+                          ((7, 30), 0.9),
+                          ((20, 20), 0),
+                          ((20, 20), 1)])
+def test_board_to_hints(dims, prob):
+    save = onono.savegame.SaveGame(dims)
+    save.randomize(prob)
+
+    for board, lines in [(save.board, save.y), (save.board.T, save.x)]:
+        offsets, lengths = onono.savegame.board_to_hints(board)
+        assert len(offsets) == len(board) + 1 and offsets[-1] == len(lengths)
+
+        for row, (hints, complete) in zip(board, lines):
+            # reference: lengths of groups of True values
+            expected = [len(list(group)) for value, group in itertools.groupby(row) if value] or [0]
+            assert hints == expected == onono.savegame.vector_to_hints(row)
+            assert complete == (expected == [0])
+
+
+@pytest.mark.parametrize('name', ["lenna", "lenny", "cvut"])
+def test_image_to_savegame_unique(name):
+    save = onono.savegame.SaveGame()
+    reference = onono.savegame.SaveGame()
+    assert save.load_from_image(name, unique=True) and reference.load_from_image(name)
+
+    assert save.solve(max_solutions=2)["unique"]
+    assert (save.board != reference.board).sum() <= 10  # only a few fields flipped
+
+
+def test_randomize_rng():
+    first, second = onono.savegame.SaveGame(), onono.savegame.SaveGame()
+    first.randomize(0.5, rng=np.random.default_rng(3))
+    second.randomize(0.5, rng=np.random.default_rng(3))
+    assert np.array_equal(first.board, second.board)
@@ -0,0 +1,127 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import onono.gamelogic
+import onono.savegame
+import onono.solver
+from onono.solver import UNKNOWN, EMPTY, FULL
+
+
+def brute_force_line(line: tuple, hints: tuple):
+    """
+    Reference line solver... tries every possible filling of the line.
+    """
+    solutions = [fields for fields in itertools.product([EMPTY, FULL], repeat=len(line))
+                 if all(known in (UNKNOWN, field) for known, field in zip(line, fields))
+                 and onono.savegame.vector_to_hints(np.array(fields)) == list(hints)]
+    if not solutions:
+        return None
+
+    return tuple(column[0] if len(set(column)) == 1 else UNKNOWN for column in zip(*solutions))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_solve_line(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(200):
+        size = int(rng.integers(1, 11))
+        hints = tuple(onono.savegame.vector_to_hints(rng.random(size) < 0.5))
+        line = tuple(rng.choice([UNKNOWN, UNKNOWN, EMPTY, FULL], size).tolist())
+
+        expected = brute_force_line(line, hints)
+        assert onono.solver.solve_line(line, hints) == expected
+        assert onono.solver.line_feasible(line, hints) == (expected is not None)
+
+
+def test_solve_line_examples():
+    assert onono.solver.solve_line((UNKNOWN,) * 10, (10,)) == (FULL,) * 10
+    assert onono.solver.solve_line((UNKNOWN,) * 10, (0,)) == (EMPTY,) * 10
+    assert onono.solver.solve_line((UNKNOWN,) * 10, (6,)) == (UNKNOWN,) * 4 + (FULL,) * 2 + (UNKNOWN,) * 4
+    assert onono.solver.solve_line((UNKNOWN,) * 10, (5, 5)) is None
+    assert onono.solver.solve_line((FULL,) + (UNKNOWN,) * 4, (0,)) is None
+
+
+@pytest.mark.parametrize('name', ["tests/valid", "Game01", "Game02", "Game03", "Game04"])
+def test_solve_game(name):
+    save = onono.savegame.SaveGame()
+    assert save.load_game(name)
+
+    result = save.solve(max_solutions=2)
+    assert result["solved"] and result["iterations"] > 0
+
+    # every solution has to match the hints
+    for solution in result["solutions"]:
+        save.guesses = 1 + solution.astype(np.int8)
+        save.mark_dirty()
+        assert onono.gamelogic.validate_game(save, incremental=True)
+
+    if result["unique"]:
+        assert np.array_equal(result["solutions"][0], save.board)
+
+
+def test_solve_diagonal():
+    save = onono.savegame.SaveGame()
+    assert save.load_game("tests/diagonal")
+
+    result = save.solve(max_solutions=2)
+    assert result["unique"] is False and len(result["solutions"]) == 2 and result["guesses"] > 0
+
+
+def test_solve_contradiction():
+    result = onono.solver.solve([[3], [0], [1]], [[1], [1], [2]], max_solutions=2)
+    assert not result["solved"] and result["unique"] is False
+
+
+def test_solve_speed():
+    save = onono.savegame.SaveGame((25, 25))
+    np.random.seed(0)
+    save.randomize(0.7)
+    onono.solver.solve_line.cache_clear()
+
+    result = save.solve(max_solutions=2, time_limit=5)
+    assert result["solved"] and not result["timeout"]
+    assert result["time"] < 1  # usually few milliseconds
+
+
+@pytest.mark.parametrize('seed', [0, 4, 6, 18])
+def test_solve_speed_half(seed):
+    # boards with half of the fields full need many guesses without probing
+    save = onono.savegame.SaveGame((25, 25))
+    save.randomize(0.5, rng=np.random.default_rng(seed))
+    onono.solver.solve_line.cache_clear()
+
+    result = save.solve(max_solutions=2, time_limit=10)
+    assert result["solved"] and result["unique"] is not None and not result["timeout"]
+    assert result["guesses"] < 50 and result["time"] < 3  # usually under a second
+
+
+def test_solve_time_limit():
+    save = onono.savegame.SaveGame((60, 60))
+    np.random.seed(0)
+    save.randomize(0.5)
+
+    result = save.solve(max_solutions=2, time_limit=0.2)
+    assert result["timeout"] and result["unique"] is None
+
+
+def test_solve_time_limit_unknown():
+    # stopped before any solution was found... solvability is not known
+    save = onono.savegame.SaveGame((60, 60))
+    np.random.seed(0)
+    save.randomize(0.5)
+
+    result = save.solve(max_solutions=1, time_limit=0.)
+    assert result["timeout"] and not result["solutions"]
+    assert result["solved"] is None and result["unique"] is None
+
+
+def test_solve_guess_limit():
+    save = onono.savegame.SaveGame((60, 60))
+    np.random.seed(0)
+    save.randomize(0.5)
+
+    result = save.solve(max_solutions=2, max_guesses=3)
+    assert result["guesses"] == 3 and not result["timeout"] and result["unique"] is None
+    assert not result["solutions"] and result["solved"] is None
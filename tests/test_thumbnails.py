@@ -0,0 +1,82 @@
+import time
+
+import numpy as np
+
+import onono.savegame
+import onono.thumbnails
+
+
+def wait(thumbnails, keys: list) -> list:
+    """
+    Requests the thumbnails until they are ready (at most few seconds).
+    """
+    for _ in range(500):
+        result = thumbnails.request(keys)
+        if all(key in thumbnails.ready for key in keys):
+            return result
+        time.sleep(0.01)
+    raise TimeoutError
+
+
+def test_make_thumbnail(tmp_path, monkeypatch):
+    save = onono.savegame.SaveGame()
+    save.set_board(np.random.default_rng(0).random((100, 70)) < 0.5)
+    save.save_path(tmp_path / "big.nono")
+
+    board = onono.thumbnails.make_thumbnail(tmp_path / "big.nono", tmp_path / "cache")
+    assert board.shape == (25, 18)
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+    # second time from the cache
+    monkeypatch.setattr(onono.grading, "load_board", None)
+    assert np.array_equal(onono.thumbnails.make_thumbnail(tmp_path / "big.nono", tmp_path / "cache"), board)
+
+
+def test_shrink():
+    board = np.zeros((10, 10), bool)
+    board[:4, :4] = True
+    assert onono.thumbnails.shrink(board, 10) is board
+    assert np.array_equal(onono.thumbnails.shrink(board, 5), np.pad(np.ones((2, 2), bool), ((0, 3), (0, 3))))
+
+
+def test_request(tmp_path):
+    thumbnails = onono.thumbnails.Thumbnails(tmp_path)
+    keys = [("save", "tests/valid"), ("save", "tests/invalid1"), ("image", "lenna"), ("image", "missing")]
+    assert len(thumbnails.request(keys)) == 4  # a fast worker may already finish some of them
+
+    valid, invalid, lenna, missing = wait(thumbnails, keys)
+    thumbnails.close()
+
+    save = onono.savegame.SaveGame()
+    assert save.load_game("tests/valid")
+    assert np.array_equal(valid, save.board)
+    assert lenna.shape == (10, 10)
+    assert invalid is None and missing is None
+
+
+def test_request_cancel(tmp_path, monkeypatch):
+    monkeypatch.setattr(onono.thumbnails, "make_thumbnail", lambda path, directory: time.sleep(0.05))
+    thumbnails = onono.thumbnails.Thumbnails(tmp_path, workers=1)
+
+    thumbnails.request([("save", f"game{i}") for i in range(20)])
+    thumbnails.request([("save", "game19")])  # scrolled away from the others
+    wait(thumbnails, [("save", "game19")])
+    thumbnails.close()
+    assert len(thumbnails.ready) < 5
+
+
+def test_request_failed(tmp_path, monkeypatch):
+    truncated = tmp_path / "truncated.png"
+    truncated.write_bytes((onono.savegame.get_saves_dir() / "images" / "lenna.png").read_bytes()[:5000])
+    monkeypatch.setattr(onono.thumbnails, "find_file", lambda kind, name: truncated)
+
+    calls = []
+    make_thumbnail = onono.thumbnails.make_thumbnail
+    monkeypatch.setattr(onono.thumbnails, "make_thumbnail", lambda *args: calls.append(args) or make_thumbnail(*args))
+
+    thumbnails = onono.thumbnails.Thumbnails(tmp_path / "cache")
+    assert wait(thumbnails, [("image", "truncated")]) == [None]
+    for _ in range(100):
+        assert thumbnails.request([("image", "truncated")]) == [None]
+    thumbnails.close()
+    assert len(calls) == 1